@@ -0,0 +1,79 @@
+"""Micro-benchmark: legacy column-wise `_evaluate` vs. the single `x @ W` kernel.
+
+Run from anywhere:
+
+    python Optimization_Engine/benchmarks/bench_evaluate.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from induction_engine import N_TO_SELECT, TrainSchedulingProblemV3  # noqa: E402
+
+POP_SIZE = 200
+FLEET_SIZES = [25, 100, 500, 2000]
+REPEATS = 400  # one "run" worth of generations
+
+
+def make_fleet(n_trains, rng):
+    mileage = rng.uniform(100_000, 200_000, n_trains)
+    mileage_norm = (mileage - mileage.min()) / (mileage.max() - mileage.min())
+    return pd.DataFrame({
+        "trainsetId": [f"TS{i + 1:04d}" for i in range(n_trains)],
+        "mileage": mileage,
+        "punctuality_score": np.round(100 - mileage_norm * 5, 2),
+        "branding_priority_score": rng.uniform(0, 50, n_trains),
+        "job_card_open": rng.random(n_trains) < 0.05,
+        "fitness_certificate_valid": rng.random(n_trains) > 0.05,
+    })
+
+
+def legacy_evaluate(df, x, out):
+    # Verbatim copy of the pre-kernel TrainSchedulingProblemV3._evaluate.
+    f1 = np.sum(x * df["mileage"].values, axis=1)
+    punctuality_scores = np.sum(x * df["punctuality_score"].values, axis=1)
+    safe_divisor = np.where(np.sum(x, axis=1) > 0, np.sum(x, axis=1), 1)
+    avg_punctuality = punctuality_scores / safe_divisor
+    f2 = 100 - avg_punctuality
+    f3 = -np.sum(x * df["branding_priority_score"].values, axis=1)
+    g1 = (np.sum(x, axis=1) - N_TO_SELECT)**2
+    g2 = np.sum(x * df["job_card_open"].values, axis=1)
+    g3 = np.sum(x * ~df["fitness_certificate_valid"].values, axis=1)
+    out["F"] = np.column_stack([f1, f2, f3])
+    out["G"] = np.column_stack([g1, g2, g3])
+
+
+def time_it(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats
+
+
+def main():
+    rng = np.random.default_rng(1)
+    print(f"{'trains':>7} | {'legacy (us)':>12} | {'x @ W (us)':>11} | {'speed-up':>8}")
+    print("-" * 48)
+    for n_trains in FLEET_SIZES:
+        df = make_fleet(n_trains, rng)
+        problem = TrainSchedulingProblemV3(df)
+        x = rng.random((POP_SIZE, n_trains)) < (N_TO_SELECT / n_trains)
+
+        legacy_out, kernel_out = {}, {}
+        legacy_evaluate(df, x, legacy_out)
+        problem._evaluate(x, kernel_out)
+        assert np.allclose(legacy_out["F"], kernel_out["F"])
+        assert np.allclose(legacy_out["G"], kernel_out["G"])
+
+        t_legacy = time_it(lambda: legacy_evaluate(df, x, {}), REPEATS)
+        t_kernel = time_it(lambda: problem._evaluate(x, {}), REPEATS)
+        print(f"{n_trains:>7} | {t_legacy * 1e6:>12.1f} | {t_kernel * 1e6:>11.1f} | {t_legacy / t_kernel:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
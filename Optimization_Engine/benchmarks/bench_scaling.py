@@ -0,0 +1,191 @@
+"""Scaling benchmark: every engine mode on synthetic fleets of growing size.
+
+For each fleet size a synthetic `trainsets.csv`, `health_and_maintenance.csv`
+and `branding_priorities.csv` (same columns as ArtificialData) is written to a
+temporary directory and planned with `plan(PlanConfig(mode=...))`. Each run
+records wall time, evaluations, peak traced memory, hypervolume and the share
+of evaluated candidates that violate a constraint; results go to JSON.
+
+    python Optimization_Engine/benchmarks/bench_scaling.py
+    python Optimization_Engine/benchmarks/bench_scaling.py --sizes 25 100 --modes nsga2 exact
+
+Hypervolume is computed per fleet size, on objectives normalised over the
+union of all modes' fronts for that size (reference point 1.1 per axis), so
+the modes are comparable within a size. Peak memory is what tracemalloc sees
+in this process; island workers are not included.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from induction_engine import PlanConfig, plan  # noqa: E402
+# Load every engine module up front so import-time allocations do not count
+# toward the first run's peak memory.
+from induction_engine import exact, features, islands, presolve, problem, termination  # noqa: E402,F401
+
+FLEET_SIZES = [25, 100, 500, 2000]
+MODES = ["nsga2", "islands", "exact", "compare"]
+SELECT_SHARE = 0.6  # 15 of 25 in the sample data
+TODAY = "2025-09-13"
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "output", "bench_scaling.json")
+
+STATUSES = ["Revenue Service", "Standby", "Inspection Bay Line"]
+NOTES = ["Brake pad replacement", "Minor cleaning required", "Scheduled maintenance", "No issues",
+         "Door system check"]
+DEPARTMENTS = ["Rolling-Stock", "Signalling", "Telecom"]
+JOB_CARD_TASKS = ["Wheel inspection", "Communication equipment check", "HVAC service", "Brake test"]
+ADVERTISERS = ["Samsung", "Paytm", "Flipkart", "Amazon", "Airtel"]
+STAMP = "2025-09-12T20:00:00Z"
+
+
+def write_fleet(n_trains, data_dir, rng):
+    """Write a synthetic fleet in the ArtificialData CSV layout to `data_dir`."""
+    ids = np.array([f"TS{i + 1:04d}" for i in range(n_trains)])
+    pd.DataFrame({
+        "trainsetId": ids,
+        "fleetNumber": np.arange(1, n_trains + 1),
+        "currentStatus": rng.choice(STATUSES, n_trains, p=[0.8, 0.16, 0.04]),
+        "lastUpdated": STAMP,
+        "lastRevenueServiceDate": "2025-09-12T09:00:00Z",
+        "stablingPosition": [f"Bay{i + 1:03d}" for i in range(n_trains)],
+        "notes": rng.choice(NOTES, n_trains),
+    }).to_csv(os.path.join(data_dir, "trainsets.csv"), index=False)
+
+    certs = pd.DataFrame({
+        "trainsetId": np.repeat(ids, len(DEPARTMENTS)),
+        "category": "Fitness Certificate",
+        "department": np.tile(DEPARTMENTS, n_trains),
+        "validityWindowStart": "2025-08-14T21:00:00Z",
+        "validityWindowEnd": "2025-09-13T21:00:00Z",
+        # ~3% of certificates explicitly not clear, the rest clear or unrecorded.
+        "isClear": rng.choice(np.array([True, False, None], dtype=object), n_trains * len(DEPARTMENTS),
+                              p=[0.67, 0.03, 0.30]),
+    })
+    n_cards = rng.integers(1, 6, n_trains)
+    cards = pd.DataFrame({
+        "trainsetId": np.repeat(ids, n_cards),
+        "category": "Job Card",
+        "jobCardId": [f"JC{i + 1:05d}" for i in range(n_cards.sum())],
+        "status": rng.choice(["Closed", "Open", "In Progress", "Pending Review"], n_cards.sum(),
+                             p=[0.97, 0.005, 0.01, 0.015]),
+        "description": rng.choice(JOB_CARD_TASKS, n_cards.sum()),
+    })
+    mileage = pd.DataFrame({
+        "trainsetId": ids,
+        "category": "Mileage",
+        "value": rng.integers(100_000, 200_000, n_trains).astype(float),
+        "lastRecordedDate": "2025-09-11T21:00:00Z",
+    })
+    hm = pd.concat([certs, cards, mileage], ignore_index=True)
+    hm = hm.reindex(columns=["trainsetId", "category", "department", "validityWindowStart", "validityWindowEnd",
+                             "isClear", "jobCardId", "status", "description", "completionDate", "value",
+                             "lastRecordedDate", "updatedBy", "updatedAt"])
+    hm["updatedBy"], hm["updatedAt"] = "user008", STAMP
+    hm.sort_values("trainsetId", kind="stable").to_csv(
+        os.path.join(data_dir, "health_and_maintenance.csv"), index=False)
+
+    required = rng.integers(800, 1600, n_trains)
+    end = pd.Timestamp(TODAY, tz="UTC") + pd.to_timedelta(rng.integers(-20, 90, n_trains), unit="D")
+    pd.DataFrame({
+        "trainsetId": ids,
+        "advertiser": rng.choice(ADVERTISERS, n_trains),
+        "contractId": [f"BR{i + 1:05d}" for i in range(n_trains)],
+        "contractualHoursRequired": required,
+        "hoursExposedToDate": (required * rng.uniform(0.2, 0.9, n_trains)).astype(int),
+        "startDate": "2025-06-15T21:00:00Z",
+        "endDate": end.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "updatedBy": "user008",
+        "updatedAt": STAMP,
+    }).to_csv(os.path.join(data_dir, "branding_priorities.csv"), index=False)
+
+
+def run_mode(data_dir, n_trains, mode, args):
+    config = PlanConfig(mode=mode, n_select=int(round(SELECT_SHARE * n_trains)), data_dir=data_dir,
+                        cache_dir=None, today=TODAY, pop_size=args.pop_size, n_max_gen=args.n_max_gen,
+                        max_time=args.max_time, seed=args.seed, n_islands=args.n_islands,
+                        exact_max_points=args.exact_max_points, exact_time_limit=args.max_time,
+                        record_history=False)
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = plan(config)
+    wall = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    violation_rate = None
+    if result.n_infeasible is not None and result.n_evals:
+        violation_rate = result.n_infeasible / result.n_evals
+    record = {
+        "n_trains": n_trains,
+        "n_select": result.n_select,
+        "n_eligible": n_trains - result.n_fixed,
+        "mode": mode,
+        "wall_time_s": wall,
+        "n_gen": result.n_gen,
+        "n_evals": result.n_evals,
+        "n_milp_solves": result.n_milp_solves,
+        "peak_memory_mb": peak / 2**20,
+        "violation_rate": violation_rate,
+        "front_size": len(result),
+    }
+    return record, result.F
+
+
+def hypervolumes(fronts):
+    """Normalised hypervolume of each front against the union of all of them."""
+    from pymoo.indicators.hv import HV
+
+    F_all = np.vstack([F for F in fronts if F is not None and len(F)])
+    ideal, nadir = F_all.min(axis=0), F_all.max(axis=0)
+    span = np.where(nadir > ideal, nadir - ideal, 1.0)
+    indicator = HV(ref_point=np.full(F_all.shape[1], 1.1))
+    return [None if F is None or not len(F) else float(indicator((F - ideal) / span)) for F in fronts]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=FLEET_SIZES)
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES)
+    parser.add_argument("--pop-size", type=int, default=200)
+    parser.add_argument("--n-max-gen", type=int, default=400)
+    parser.add_argument("--max-time", type=float, default=120.0,
+                        help="cap per NSGA2 run and per exact enumeration (seconds)")
+    parser.add_argument("--n-islands", type=int, default=None)
+    parser.add_argument("--exact-max-points", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    records = []
+    for n_trains in args.sizes:
+        with tempfile.TemporaryDirectory() as data_dir:
+            write_fleet(n_trains, data_dir, np.random.default_rng(n_trains))
+            runs = [run_mode(data_dir, n_trains, mode, args) for mode in args.modes]
+        for (record, _), hv in zip(runs, hypervolumes([F for _, F in runs])):
+            record["hypervolume"] = hv
+            records.append(record)
+            rate = "-" if record["violation_rate"] is None else f"{record['violation_rate']:.3f}"
+            print(f"{n_trains:>5} {record['mode']:<8} {record['wall_time_s']:8.2f}s "
+                  f"evals={record['n_evals'] or record['n_milp_solves']:<8} "
+                  f"peak={record['peak_memory_mb']:7.1f}MB hv={hv if hv is None else round(hv, 4)} "
+                  f"violations={rate} front={record['front_size']}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump({"python": platform.python_version(), "cpu_count": os.cpu_count(), "args": vars(args),
+                   "runs": records}, f, indent=2)
+    print(f"Results written to {os.path.abspath(args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Startup benchmark: wall time and heavy modules loaded by importing the engine.
+
+Each statement runs in a fresh interpreter (best of REPEATS), so nothing is
+shared between measurements. Run from anywhere:
+
+    python Optimization_Engine/benchmarks/bench_startup.py
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+ENGINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+REPEATS = 5
+HEAVY_MODULES = ["numpy", "pandas", "scipy", "pymoo", "matplotlib"]
+
+STATEMENTS = [
+    "pass",
+    "import induction_engine",
+    "from induction_engine import plan, PlanConfig",
+    "import optimization_engine_v2, optimization_engine_v3",
+    "from induction_engine import TrainSchedulingProblemV3",
+    "import induction_engine.plotting, matplotlib.pyplot",
+]
+
+PROBE = (
+    "import sys, json\n"
+    "{statement}\n"
+    "print(json.dumps([m for m in {heavy!r} if m in sys.modules]))\n"
+)
+
+
+def measure(statement):
+    best, loaded = float("inf"), None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", PROBE.format(statement=statement, heavy=HEAVY_MODULES)],
+                             cwd=ENGINE_DIR, capture_output=True, text=True, check=True).stdout
+        best = min(best, time.perf_counter() - start)
+        loaded = json.loads(out)
+    return best, loaded
+
+
+def main():
+    baseline, _ = measure("pass")
+    print(f"{'statement':<56} {'ms':>8} {'+ms':>8}  heavy modules loaded")
+    for statement in STATEMENTS:
+        elapsed, loaded = measure(statement)
+        print(f"{statement:<56} {elapsed * 1e3:8.1f} {(elapsed - baseline) * 1e3:8.1f}  "
+              f"{', '.join(loaded) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
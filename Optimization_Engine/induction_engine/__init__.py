@@ -0,0 +1,42 @@
+"""Shared building blocks for the KMRL fleet induction optimization engines.
+
+`plan(PlanConfig(...))` runs one night end to end. Names are resolved lazily:
+importing the package loads nothing heavy, and numpy/pandas/pymoo are only
+imported when a name that needs them is first used.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "plan": "planner",
+    "PlanConfig": "planner",
+    "PlanResult": "planner",
+    "N_TO_SELECT": "problem",
+    "TrainSchedulingProblemV2": "problem",
+    "TrainSchedulingProblemV3": "problem",
+    "build_weight_matrix": "problem",
+    "InfeasibleNightError": "errors",
+    "diagnose": "diagnose",
+    "InductionAssignmentProblem": "assignment",
+    "assignment_operators": "assignment",
+    "FixedCardinalitySampling": "operators",
+    "FixedCardinalityCrossover": "operators",
+    "FixedCardinalityMutation": "operators",
+    "FixedCardinalityRepair": "operators",
+    "fixed_cardinality_operators": "operators",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
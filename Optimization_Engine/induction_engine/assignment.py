@@ -0,0 +1,195 @@
+import numpy as np
+from pymoo.core.crossover import Crossover
+from pymoo.core.mutation import Mutation
+from pymoo.core.problem import Problem
+from pymoo.core.repair import Repair
+from pymoo.core.sampling import Sampling
+
+from .operators import repair_to_k, swap_mutation, top_k_mask
+from .problem import (N_TO_SELECT, N_WEIGHT_COLUMNS, W_BRANDING, W_CERT_INVALID, W_COUNT,
+                      W_JOB_CARD_OPEN, W_MILEAGE, W_PUNCTUALITY, build_weight_matrix)
+
+# Three-way induction plan: every trainset is assigned to Revenue Service,
+# Standby or the Inspection Bay Line (the `currentStatus` values of
+# trainsets.csv) in one optimisation. A candidate is an integer vector of class
+# codes; its revenue and standby indicator rows times the per-trainset weight
+# matrix give every class's sums in a single (2 * pop, n) @ (n, 7) product.
+
+REVENUE, STANDBY, IBL = 0, 1, 2
+N_CLASSES = 3
+STATUS_NAMES = ("Revenue Service", "Standby", "Inspection Bay Line")
+
+W_INELIGIBLE = N_WEIGHT_COLUMNS  # open job card or invalid Rolling-Stock certificate
+
+
+def assignment_weight_matrix(df):
+    """The v3 weight matrix plus an ineligibility column."""
+    W = build_weight_matrix(df)
+    ineligible = (W[:, W_JOB_CARD_OPEN] > 0) | (W[:, W_CERT_INVALID] > 0)
+    return np.ascontiguousarray(np.column_stack([W, ineligible.astype(np.float64)]))
+
+
+def as_codes(X):
+    X = np.asarray(X)
+    return np.rint(X).astype(np.int64) if X.dtype.kind == "f" else X.astype(np.int64, copy=False)
+
+
+def class_sums(X, W):
+    """(pop, 3, n_columns) per-class sums of W's columns for class-code rows X.
+
+    Revenue and standby indicators go through one stacked matmul; the IBL sums
+    are the fleet totals minus both, since every trainset is in one class.
+    """
+    X = as_codes(X)
+    indicators = np.concatenate([X == REVENUE, X == STANDBY]).astype(np.float64)
+    revenue, standby = (indicators @ W).reshape(2, len(X), W.shape[1])
+    return np.stack([revenue, standby, W.sum(axis=0) - revenue - standby], axis=1)
+
+
+class InductionAssignmentProblem(Problem):
+    """Revenue / Standby / IBL assignment with per-class quotas.
+
+    Objectives: revenue mileage, 100 - revenue punctuality, -revenue branding
+    (as in v3) and -standby depth, the number of fit trainsets on standby.
+    Constraints: exactly `n_revenue` in service, no unfit trainset in service,
+    at most `ibl_capacity` on the IBL, at least `min_standby` on standby, and
+    unfit trainsets take IBL places ahead of fit ones while places remain.
+    """
+
+    def __init__(self, df, n_revenue=N_TO_SELECT, min_standby=0, ibl_capacity=None):
+        super().__init__(n_var=len(df), n_obj=4, n_constr=6, xl=0, xu=N_CLASSES - 1, vtype=int)
+        self.df = df
+        self.n_revenue = n_revenue
+        self.min_standby = min_standby
+        self.ibl_capacity = len(df) if ibl_capacity is None else ibl_capacity
+        self.W = assignment_weight_matrix(df)
+        self.n_ineligible = int(self.W[:, W_INELIGIBLE].sum())
+        self.n_evaluated = 0
+        self.n_infeasible = 0
+
+    def _evaluate(self, x, out, *args, **kwargs):
+        M = class_sums(x, self.W)
+        revenue, standby, ibl = M[:, REVENUE], M[:, STANDBY], M[:, IBL]
+        count = revenue[:, W_COUNT]
+        safe_divisor = np.where(count > 0, count, 1.0)
+
+        f1 = revenue[:, W_MILEAGE]
+        f2 = 100 - revenue[:, W_PUNCTUALITY] / safe_divisor
+        f3 = -revenue[:, W_BRANDING]
+        f4 = -(standby[:, W_COUNT] - standby[:, W_INELIGIBLE])
+        g1 = (count - self.n_revenue) ** 2
+        g2 = revenue[:, W_JOB_CARD_OPEN]
+        g3 = revenue[:, W_CERT_INVALID]
+        g4 = ibl[:, W_COUNT] - self.ibl_capacity
+        g5 = self.min_standby - standby[:, W_COUNT]
+        g6 = min(self.n_ineligible, self.ibl_capacity) - ibl[:, W_INELIGIBLE]
+        G = np.column_stack([g1, g2, g3, g4, g5, g6])
+        self.n_evaluated += len(M)
+        self.n_infeasible += int(np.count_nonzero((G > 0).any(axis=1)))
+        out["F"] = np.column_stack([f1, f2, f3, f4])
+        out["G"] = G
+
+
+def cap_class(X, label, capacity, random_state, fallback=STANDBY):
+    """Move random members of `label` beyond `capacity` per row to `fallback`."""
+    members = X == label
+    keys = np.where(members, random_state.random(X.shape), -1.0)
+    rank = np.argsort(np.argsort(-keys, axis=1), axis=1)
+    return np.where(members & (rank >= capacity), fallback, X)
+
+
+def repair_assignment(X, n_revenue, ibl_capacity, random_state, priority=None):
+    """Exactly `n_revenue` in service and at most `ibl_capacity` on the IBL.
+
+    Revenue membership is repaired like a k-hot vector (see `repair_to_k`);
+    trainsets leaving service go to standby.
+    """
+    X = as_codes(X)
+    revenue = repair_to_k(X == REVENUE, n_revenue, random_state, priority)
+    X = np.where(revenue, REVENUE, np.where(X == IBL, IBL, STANDBY))
+    return cap_class(X, IBL, ibl_capacity, random_state)
+
+
+class AssignmentSampling(Sampling):
+    def __init__(self, n_revenue, ibl_capacity):
+        super().__init__()
+        self.n_revenue = n_revenue
+        self.ibl_capacity = ibl_capacity
+
+    def _do(self, problem, n_samples, *args, random_state=None, **kwargs):
+        X = random_state.integers(STANDBY, IBL + 1, (n_samples, problem.n_var))
+        revenue = top_k_mask(random_state.random(X.shape), self.n_revenue)
+        return repair_assignment(np.where(revenue, REVENUE, X), self.n_revenue, self.ibl_capacity,
+                                 random_state)
+
+
+class AssignmentCrossover(Crossover):
+    """k-hot crossover on the revenue sets; other trainsets inherit a parent's class."""
+
+    def __init__(self, n_revenue, ibl_capacity, prob=0.9, **kwargs):
+        super().__init__(2, 2, prob=prob, **kwargs)
+        self.n_revenue = n_revenue
+        self.ibl_capacity = ibl_capacity
+
+    def _do(self, problem, X, *args, random_state=None, **kwargs):
+        a, b = as_codes(X[0]), as_codes(X[1])
+        shared = (a == REVENUE) & (b == REVENUE)
+        either = (a == REVENUE) ^ (b == REVENUE)
+        offspring = []
+        for first, second in ((a, b), (b, a)):
+            keys = np.where(shared, 2.0, np.where(either, random_state.random(a.shape), -1.0))
+            revenue = top_k_mask(keys, self.n_revenue)
+            rest = np.where(first != REVENUE, first, np.where(second != REVENUE, second, STANDBY))
+            child = np.where(revenue, REVENUE, rest)
+            offspring.append(cap_class(child, IBL, self.ibl_capacity, random_state))
+        return np.stack(offspring)
+
+
+class AssignmentMutation(Mutation):
+    """Swap in-service and out-of-service trainsets (the leaver takes the joiner's
+    class), then flip one non-revenue trainset between Standby and IBL."""
+
+    def __init__(self, ibl_capacity, n_swaps=1, prob=1.0, **kwargs):
+        super().__init__(prob=prob, **kwargs)
+        self.ibl_capacity = ibl_capacity
+        self.n_swaps = n_swaps
+
+    def _do(self, problem, X, *args, random_state=None, **kwargs):
+        X = as_codes(X)
+        revenue = X == REVENUE
+        swapped = swap_mutation(revenue, self.n_swaps, random_state)
+        # Every row gains as many trainsets as it loses, so the row-major
+        # nonzero lists of joiners and leavers pair up row by row.
+        joiners, leavers = np.nonzero(swapped & ~revenue), np.nonzero(revenue & ~swapped)
+        Xp = X.copy()
+        Xp[leavers] = X[joiners]
+        Xp[joiners] = REVENUE
+
+        rows = np.arange(len(Xp))
+        pick = np.where(Xp != REVENUE, random_state.random(Xp.shape), -1.0).argmax(axis=1)
+        ok = Xp[rows, pick] != REVENUE
+        Xp[rows[ok], pick[ok]] = STANDBY + IBL - Xp[rows[ok], pick[ok]]
+        return cap_class(Xp, IBL, self.ibl_capacity, random_state)
+
+
+class AssignmentRepair(Repair):
+    def __init__(self, n_revenue, ibl_capacity, priority=None):
+        super().__init__()
+        self.n_revenue = n_revenue
+        self.ibl_capacity = ibl_capacity
+        self.priority = priority
+
+    def _do(self, problem, X, random_state=None, **kwargs):
+        if random_state is None:
+            random_state = np.random.default_rng()
+        return repair_assignment(X, self.n_revenue, self.ibl_capacity, random_state, self.priority)
+
+
+def assignment_operators(n_revenue, ibl_capacity, n_swaps=1):
+    """Keyword arguments that keep a pymoo GA inside the revenue and IBL quotas."""
+    return dict(
+        sampling=AssignmentSampling(n_revenue, ibl_capacity),
+        crossover=AssignmentCrossover(n_revenue, ibl_capacity),
+        mutation=AssignmentMutation(ibl_capacity, n_swaps=n_swaps),
+        repair=AssignmentRepair(n_revenue, ibl_capacity),
+    )
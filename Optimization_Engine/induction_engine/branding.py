@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+from .features import DATA_DIR, source_path
+
+# Branding exposure from the service blocks an inducted trainset would run.
+# Tomorrow's blocks (see `demand.service_demand`) are handed out longest first
+# to the selected trainsets whose wraps are furthest behind, so a selection
+# mask maps straight to exposure hours per trainset. Each contract is then
+# covered up to its pro-rata need for the day. For a population this is a
+# column permutation, a cumulative sum and two gathers: one array pass.
+
+PEAK_WEIGHT = 1.5  # an hour in a commuter peak is worth this many off-peak hours
+
+
+def contract_needs(trainset_ids, data_dir=DATA_DIR, today=None):
+    """(trainset index, hours needed tomorrow) for every live contract.
+
+    A contract needs its remaining hours spread evenly over the days left;
+    expired or fulfilled contracts and contracts on trainsets outside
+    `trainset_ids` are dropped.
+    """
+    contracts = pd.read_csv(source_path(data_dir, "branding_priorities.csv"))
+    today = pd.Timestamp.now(tz="UTC") if today is None else pd.Timestamp(today)
+    if today.tzinfo is None:
+        today = today.tz_localize("UTC")
+    days_left = (pd.to_datetime(contracts["endDate"], utc=True) - today).dt.days.to_numpy()
+    remaining = (contracts["contractualHoursRequired"] - contracts["hoursExposedToDate"]).to_numpy(dtype=np.float64)
+    position = pd.Index(trainset_ids).get_indexer(contracts["trainsetId"])
+    live = (days_left > 0) & (remaining > 0) & (position >= 0)
+    return position[live], remaining[live] / days_left[live]
+
+
+class BrandingExposure:
+    """Peak-weighted exposure and contract coverage for selection masks."""
+
+    def __init__(self, n_trainsets, block_hours, block_peak_hours, contract_trainset, contract_need,
+                 peak_weight=PEAK_WEIGHT):
+        self.contract_trainset = np.asarray(contract_trainset, dtype=np.int64)
+        self.contract_need = np.asarray(contract_need, dtype=np.float64)
+        self.total_need = float(self.contract_need.sum())
+        need = np.bincount(self.contract_trainset, weights=self.contract_need, minlength=n_trainsets)
+        # Trainsets most behind on their wraps are served first.
+        self.order = np.argsort(-need, kind="stable")
+        weighted = np.asarray(block_hours) + (peak_weight - 1) * np.asarray(block_peak_hours)
+        # Slot r holds the block of the r-th selected trainset in that order;
+        # selections beyond the blocks are spares and run nothing.
+        self.hours_by_rank = np.zeros(n_trainsets + 1)
+        ranked = np.sort(weighted)[::-1][:n_trainsets]
+        self.hours_by_rank[:len(ranked)] = ranked
+
+    @classmethod
+    def from_demand(cls, demand, trainset_ids, data_dir=DATA_DIR, today=None, peak_weight=PEAK_WEIGHT):
+        contract_trainset, contract_need = contract_needs(trainset_ids, data_dir, today)
+        return cls(len(trainset_ids), demand.block_hours, demand.block_peak_hours, contract_trainset,
+                   contract_need, peak_weight)
+
+    def exposure(self, X):
+        """(pop, n_trainsets) weighted revenue hours each trainset would run."""
+        selected = np.asarray(X, dtype=bool)[:, self.order]
+        rank = np.cumsum(selected, axis=1) - 1
+        E = np.empty(selected.shape)
+        E[:, self.order] = np.where(selected, self.hours_by_rank[np.maximum(rank, 0)], 0.0)
+        return E
+
+    def coverage(self, X):
+        """Contract hours covered tomorrow, summed over contracts, per row of X."""
+        return np.minimum(self.exposure(X)[:, self.contract_trainset], self.contract_need).sum(axis=1)
@@ -0,0 +1,195 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .features import DATA_DIR, source_path
+
+# Cleaning stage: book the night's trainsets that need cleaning into the free
+# slots of cleaning_slots.csv. Slot times are parsed once into int64 seconds
+# and sorted, so the slots of a night are one `searchsorted` away, and a sweep
+# over the sorted start/end events cuts the night into segments with constant
+# crew usage. Each slot covers one contiguous range of segments: bookings
+# update the usage through a difference array and checking every slot against
+# the depot-wide crew cap is one sparse-table range max, never a pairwise
+# overlap test.
+
+CLEANING_TYPES = ("Exterior Wash", "Interior Detailing", "Deep Clean")
+FULL_SERVICE = "Full Service"  # a full-service slot can take any cleaning job
+CREW_REQUIRED = {"Exterior Wash": 2, "Interior Detailing": 2, "Deep Clean": 3}
+NIGHT_START_HOUR = 21
+NIGHT_END_HOUR = 5
+
+
+def _epoch_seconds(times):
+    return (times - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(seconds=1)
+
+
+def load_slots(data_dir=DATA_DIR):
+    slots = pd.read_csv(source_path(data_dir, "cleaning_slots.csv"))
+    for column, times in (("start", "startTime"), ("end", "endTime")):
+        slots[column] = _epoch_seconds(pd.to_datetime(slots[times], utc=True))
+    return slots.sort_values(["start", "end"], kind="stable").reset_index(drop=True)
+
+
+def cleaning_demand(trainset_ids, data_dir=DATA_DIR):
+    """Cleaning job per trainset: "Deep Clean" when its bay is not clean,
+    "Interior Detailing" when its notes ask for cleaning, else None."""
+    bays = pd.read_csv(source_path(data_dir, "stabling_bays.csv"))
+    trainsets = pd.read_csv(source_path(data_dir, "trainsets.csv"))
+    dirty = set(bays.loc[bays["isClean"].eq(False), "trainsetId"].dropna())
+    noted = set(trainsets.loc[trainsets["notes"].str.contains("cleaning", case=False, na=False), "trainsetId"])
+    return np.array([
+        "Deep Clean" if tid in dirty else "Interior Detailing" if tid in noted else None
+        for tid in trainset_ids
+    ], dtype=object)
+
+
+def night_window(date, start_hour=NIGHT_START_HOUR, end_hour=NIGHT_END_HOUR):
+    """(start, end) epoch seconds of the night that begins on `date`."""
+    day = pd.Timestamp(date)
+    day = (day.tz_localize("UTC") if day.tzinfo is None else day.tz_convert("UTC")).normalize()
+    start = day + pd.Timedelta(hours=start_hour)
+    end = day + pd.Timedelta(days=1, hours=end_hour)
+    return _epoch_seconds(start), _epoch_seconds(end)
+
+
+class SlotIndex:
+    """Free slots of one window with their sweep-line segments."""
+
+    def __init__(self, slots, window):
+        lo = np.searchsorted(slots["start"].to_numpy(), window[0], side="left")
+        hi = np.searchsorted(slots["start"].to_numpy(), window[1], side="left")
+        night = slots.iloc[lo:hi]
+        night = night[night["end"].to_numpy() <= window[1]]
+        self.all_slots = night
+        self.busy_crew = np.where(night["isOccupied"].to_numpy(dtype=bool),
+                                  night["manpowerAllocated"].to_numpy(dtype=np.int64), 0)
+
+        # Sweep: sorted unique event times cut the window into segments;
+        # slot i covers segments [first[i], last[i]).
+        start, end = night["start"].to_numpy(), night["end"].to_numpy()
+        self.events = np.unique(np.concatenate([start, end]))
+        self.first = np.searchsorted(self.events, start)
+        self.last = np.searchsorted(self.events, end)
+        self.n_segments = max(len(self.events) - 1, 0)
+
+        self.free = ~night["isOccupied"].to_numpy(dtype=bool)
+        self.slot_type = night["type"].to_numpy(dtype=str)
+        self.crew = night["manpowerAllocated"].to_numpy(dtype=np.int64)
+        self.end = end
+
+    def usable(self, job_type):
+        """Free slots that can take `job_type` with enough crew."""
+        return (self.free & ((self.slot_type == job_type) | (self.slot_type == FULL_SERVICE))
+                & (self.crew >= CREW_REQUIRED[job_type]))
+
+    def usage(self, crew):
+        """Crew in use per segment when slot i holds `crew[i]` cleaners."""
+        diff = np.zeros(self.n_segments + 1, dtype=np.int64)
+        np.add.at(diff, self.first, crew)
+        np.add.at(diff, self.last, -np.asarray(crew))
+        return np.cumsum(diff[:-1])
+
+    def peak(self, usage):
+        """Largest `usage` over each slot's segments (0 for empty slots)."""
+        # Sparse table: table[k, j] is the max of usage[j:j + 2**k].
+        table = [np.asarray(usage)]
+        while 2 ** len(table) <= len(usage):
+            half = 2 ** (len(table) - 1)
+            table.append(np.maximum(table[-1][:-half], table[-1][half:]))
+        width = self.last - self.first
+        k = np.log2(np.maximum(width, 1)).astype(np.int64)
+        peak = np.zeros(len(width), dtype=np.int64)
+        for level in np.unique(k[width > 0]):
+            rows = np.flatnonzero((k == level) & (width > 0))
+            lo, hi = self.first[rows], self.last[rows] - 2 ** level
+            peak[rows] = np.maximum(table[level][lo], table[level][hi])
+        return peak
+
+    def capacity(self):
+        """Usable free slots per cleaning type and full-service slots."""
+        dedicated = np.array([np.count_nonzero(self.usable(t) & (self.slot_type == t)) for t in CLEANING_TYPES])
+        full = np.count_nonzero(self.free & (self.slot_type == FULL_SERVICE)
+                                & (self.crew >= min(CREW_REQUIRED.values())))
+        return dedicated, full
+
+
+@dataclass
+class CleaningSchedule:
+    trainset_ids: np.ndarray
+    slot_ids: np.ndarray
+    unmet: np.ndarray
+    peak_crew: int
+
+    @property
+    def n_unmet(self):
+        return len(self.unmet)
+
+
+def schedule_cleaning(index, trainset_ids, jobs, max_crew=None):
+    """Greedy earliest-finish booking of `jobs` (cleaning type per trainset).
+
+    Jobs needing the most crew go first; each takes the earliest-ending free
+    slot of its type (or full-service) with enough crew, keeping the
+    depot-wide crew in use at every instant within `max_crew`. Trainsets
+    left without a slot are returned in `unmet`.
+    """
+    trainset_ids = np.asarray(trainset_ids)
+    jobs = np.asarray(jobs, dtype=object)
+    wanted = np.flatnonzero(jobs != None)  # noqa: E711 (elementwise)
+    order = wanted[np.argsort([-CREW_REQUIRED[j] for j in jobs[wanted]], kind="stable")]
+
+    usage = index.usage(index.busy_crew)
+    taken = np.zeros(len(index.free), dtype=bool)
+    booked, slots, unmet = [], [], []
+    for i in order:
+        candidates = index.usable(jobs[i]) & ~taken
+        if max_crew is not None and candidates.any():
+            candidates &= index.peak(usage) + index.crew <= max_crew
+        if not candidates.any():
+            unmet.append(trainset_ids[i])
+            continue
+        s = np.flatnonzero(candidates)[np.argmin(index.end[candidates])]
+        taken[s] = True
+        usage[index.first[s]:index.last[s]] += index.crew[s]
+        booked.append(trainset_ids[i])
+        slots.append(index.all_slots["slotId"].iloc[s])
+    return CleaningSchedule(np.array(booked, dtype=str), np.array(slots, dtype=str), np.array(unmet, dtype=str),
+                            int(usage.max(initial=0)))
+
+
+def demand_matrix(jobs):
+    """(n_trainsets, 3) one-hot of each trainset's cleaning type."""
+    jobs = np.asarray(jobs, dtype=object)
+    return np.column_stack([(jobs == t) for t in CLEANING_TYPES]).astype(np.float64)
+
+
+def cleaning_capacity(index, jobs):
+    """The (demand, dedicated, full) triple the optimizer's cleaning constraint takes."""
+    return (demand_matrix(jobs), *index.capacity())
+
+
+def unmet_demand_bound(X, D, dedicated, full):
+    """Lower bound on unmet cleaning jobs for every row of X, in one pass.
+
+    Every dedicated slot takes one job of its type and full-service slots
+    take the overflow of any type. The per-slot crew and the time layout are
+    ignored, so a row with a positive bound can never be scheduled.
+    """
+    overflow = np.maximum(np.asarray(X, dtype=np.float64) @ D - dedicated, 0).sum(axis=1)
+    return np.maximum(overflow - full, 0)
+
+
+def cleanable_count(D, dedicated, full):
+    """Most rows of D (one-hot cleaning jobs) one plan can hold with no unmet job.
+
+    Trainsets without a job are free; each type fills its dedicated slots and
+    the overflow of every type shares the full-service slots, the same
+    counting as `unmet_demand_bound`.
+    """
+    D = np.asarray(D, dtype=np.float64)
+    per_type = D.sum(axis=0)
+    overflow = np.maximum(per_type - dedicated, 0).sum()
+    n_free = len(D) - np.count_nonzero(D.any(axis=1))
+    return int(n_free + np.minimum(per_type, dedicated).sum() + min(full, overflow))
@@ -0,0 +1,112 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from .solutions import OBJECTIVE_NAMES, report_objectives
+
+# Decision selection over a front, so the nightly run can publish one plan.
+# The front is normalised to [0, 1] per objective between its ideal and nadir
+# points; the knee, the compromise and the operator's preferred solution are
+# each one reduction over that (n_solutions, n_obj) array.
+
+
+def normalise(F):
+    """F scaled to [0, 1] per objective; constant objectives become 0."""
+    F = np.atleast_2d(np.asarray(F, dtype=np.float64))
+    ideal, nadir = F.min(axis=0), F.max(axis=0)
+    span = np.where(nadir > ideal, nadir - ideal, 1.0)
+    return (F - ideal) / span, ideal, span
+
+
+def knee_distance(Fn):
+    """Distance of each normalised point below the hyperplane through the
+    front's extreme points; the knee is the largest."""
+    extremes = Fn[Fn.argmin(axis=0)]
+    try:
+        normal = np.linalg.solve(extremes, np.ones(Fn.shape[1]))
+    except np.linalg.LinAlgError:
+        normal = None
+    if normal is None or not np.all(np.isfinite(normal)) or np.any(normal <= 0):
+        # Degenerate extremes (few points or shared minima): use the plane
+        # through the unit points instead.
+        normal = np.ones(Fn.shape[1])
+    return (1 - Fn @ normal) / np.linalg.norm(normal)
+
+
+@dataclass
+class Shortlist:
+    """Ranked solution indices into the front, best first.
+
+    `reasons[k]` says why `index[k]` was shortlisted; `knee`, `compromise`
+    and `preferred` are the individual picks and `scores` the per-solution
+    criteria they were taken from.
+    """
+
+    index: np.ndarray
+    reasons: list
+    knee: int
+    compromise: int
+    preferred: int
+    scores: dict
+
+    @property
+    def recommended(self):
+        return int(self.index[0])
+
+    def __len__(self):
+        return len(self.index)
+
+
+def shortlist(F, objective_names=OBJECTIVE_NAMES, weights=None, reference=None, n=5):
+    """Knee, compromise and preferred solutions of the front F, then the rest.
+
+    `weights` (a sequence or a dict by objective name; larger means more
+    important) and `reference` (an aspiration point in report units, i.e.
+    punctuality in % and branding as a positive score) define the operator's
+    preference: the solution minimising the weighted Chebyshev distance
+    beyond the reference. Without them the preference is the equal-weight
+    distance beyond the ideal point and the knee leads the shortlist.
+    Raises ValueError for an empty front.
+    """
+    if F is None or np.size(F) == 0:
+        raise ValueError("The front is empty; there is no plan to recommend.")
+    F = np.atleast_2d(np.asarray(F, dtype=np.float64))
+    names = tuple(objective_names[:F.shape[1]])
+    Fn, ideal, span = normalise(F)
+
+    w = np.ones(F.shape[1])
+    if weights is not None:
+        w = np.array([weights.get(name, 0.0) for name in names] if isinstance(weights, dict) else weights,
+                     dtype=np.float64)
+    w = w / w.sum()
+    r = np.zeros(F.shape[1])
+    if reference is not None:
+        r = (report_objectives(np.asarray(reference, dtype=np.float64), names)[0] - ideal) / span
+
+    scores = {
+        "knee_distance": knee_distance(Fn),
+        "ideal_distance": np.linalg.norm(Fn, axis=1),
+        "preference": np.max(w * (Fn - r), axis=1),
+    }
+    knee = int(scores["knee_distance"].argmax())
+    compromise = int(scores["ideal_distance"].argmin())
+    preferred = int(scores["preference"].argmin())
+
+    picks = [(knee, "knee point"), (compromise, "closest to the ideal point")]
+    if weights is not None or reference is not None:
+        picks.insert(0, (preferred, "best match for the operator preference"))
+    index, reasons = [], []
+    for i, reason in picks:
+        if i in index:
+            reasons[index.index(i)] += f"; {reason}"
+        else:
+            index.append(i)
+            reasons.append(reason)
+    for i in np.argsort(scores["preference"], kind="stable"):
+        if len(index) >= n:
+            break
+        if i not in index:
+            index.append(int(i))
+            reasons.append("next by preference")
+    n = max(n, 1)
+    return Shortlist(np.array(index[:n]), reasons[:n], knee, compromise, preferred, scores)
@@ -0,0 +1,148 @@
+import heapq
+import math
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from .features import GTFS_DIR_ENV, default_dir, source_path
+
+# Service demand from the GTFS feed in KMRLOpenData: the trips running on a
+# date are chained into vehicle blocks, and the number of blocks plus a spare
+# margin is how many trainsets to induct. stop_times.csv is parsed once per
+# feed into integer-second arrays; each date's demand is cached on top.
+
+GTFS_DIR = default_dir(GTFS_DIR_ENV, "KMRLOpenData")
+MIN_LAYOVER_S = 120    # turnaround time at a terminal before the next trip
+SPARE_MARGIN = 0.10    # share of the peak requirement held as spares
+# Commuter peaks (seconds after midnight); revenue hours inside them
+# are reported separately so branding can weight them.
+PEAK_WINDOWS = ((8 * 3600, 11 * 3600), (17 * 3600, 20 * 3600))
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+
+def parse_gtfs_time(times):
+    """Seconds after midnight for "HH:MM:SS" strings (hours may exceed 24)."""
+    parts = pd.Series(times, dtype=str).str.split(":", expand=True).astype(np.int64).to_numpy()
+    return parts @ np.array([3600, 60, 1], dtype=np.int64)
+
+
+@dataclass
+class TripTable:
+    """One row per trip, sorted by first departure, with integer-second times."""
+
+    trip_id: np.ndarray
+    service_id: np.ndarray
+    departure: np.ndarray
+    arrival: np.ndarray
+    origin: np.ndarray
+    destination: np.ndarray
+
+
+@lru_cache(maxsize=4)
+def load_trips(gtfs_dir=GTFS_DIR):
+    """Parse trips.csv and stop_times.csv once into a `TripTable`."""
+    stop_times = pd.read_csv(source_path(gtfs_dir, "stop_times.csv", GTFS_DIR_ENV),
+                             usecols=["trip_id", "stop_sequence", "stop_id", "arrival_time", "departure_time"])
+    stop_times = stop_times.sort_values(["trip_id", "stop_sequence"], kind="stable")
+    trip_codes, trip_ids = pd.factorize(stop_times["trip_id"], sort=True)
+    departure = parse_gtfs_time(stop_times["departure_time"])
+    arrival = parse_gtfs_time(stop_times["arrival_time"])
+    stops = stop_times["stop_id"].to_numpy(dtype=str)
+
+    # Rows are grouped by trip, so each trip's first and last stop are the
+    # boundaries of its run of equal codes.
+    first = np.flatnonzero(np.r_[True, trip_codes[1:] != trip_codes[:-1]])
+    last = np.r_[first[1:] - 1, len(trip_codes) - 1]
+    trips = pd.read_csv(source_path(gtfs_dir, "trips.csv", GTFS_DIR_ENV), usecols=["trip_id", "service_id"])
+    service = trips.set_index("trip_id")["service_id"].reindex(trip_ids).to_numpy(dtype=str)
+
+    order = np.argsort(departure[first], kind="stable")
+    return TripTable(np.asarray(trip_ids, dtype=str)[order], service[order], departure[first][order],
+                     arrival[last][order], stops[first][order], stops[last][order])
+
+
+def active_service_ids(date, gtfs_dir=GTFS_DIR):
+    """service_ids running on `date`, from calendar.csv and calendar_dates.csv."""
+    day = pd.Timestamp(date)
+    stamp = int(day.strftime("%Y%m%d"))
+    calendar = pd.read_csv(source_path(gtfs_dir, "calendar.csv", GTFS_DIR_ENV))
+    running = calendar[WEEKDAYS[day.dayofweek]].eq(1) & calendar["start_date"].le(stamp) & calendar["end_date"].ge(stamp)
+    active = set(calendar.loc[running, "service_id"])
+    exceptions_path = source_path(gtfs_dir, "calendar_dates.csv", GTFS_DIR_ENV)
+    if os.path.exists(exceptions_path):
+        exceptions = pd.read_csv(exceptions_path)
+        exceptions = exceptions[exceptions["date"].eq(stamp)]
+        active |= set(exceptions.loc[exceptions["exception_type"].eq(1), "service_id"])
+        active -= set(exceptions.loc[exceptions["exception_type"].eq(2), "service_id"])
+    return sorted(active)
+
+
+def chain_blocks(departure, arrival, origin, destination, min_layover=MIN_LAYOVER_S):
+    """Greedy vehicle blocks for trips sorted by departure.
+
+    Each trip takes the vehicle that has waited longest at its origin
+    terminal, if that vehicle is ready `min_layover` seconds before the
+    departure; otherwise a new vehicle (block) starts. Returns the block
+    index of every trip.
+    """
+    waiting = {}  # terminal -> heap of (ready time, block)
+    block = np.empty(len(departure), dtype=np.int64)
+    n_blocks = 0
+    for i in range(len(departure)):
+        queue = waiting.get(origin[i])
+        if queue and queue[0][0] <= departure[i]:
+            _, block[i] = heapq.heappop(queue)
+        else:
+            block[i], n_blocks = n_blocks, n_blocks + 1
+        heapq.heappush(waiting.setdefault(destination[i], []), (arrival[i] + min_layover, block[i]))
+    return block
+
+
+@dataclass
+class ServiceDemand:
+    """Vehicle requirement and revenue hours of one service day."""
+
+    date: str
+    service_ids: tuple
+    n_trips: int
+    n_blocks: int
+    n_spare: int
+    block_hours: np.ndarray
+    block_peak_hours: np.ndarray
+
+    @property
+    def n_required(self):
+        """Trainsets to induct: one per block plus the spares."""
+        return self.n_blocks + self.n_spare
+
+    @property
+    def hours_per_train(self):
+        """Mean revenue hours of a block, the exposure one inducted trainset gets."""
+        return float(self.block_hours.mean()) if len(self.block_hours) else 0.0
+
+
+@lru_cache(maxsize=32)
+def service_demand(date, gtfs_dir=GTFS_DIR, spare_margin=SPARE_MARGIN, min_layover=MIN_LAYOVER_S):
+    """`ServiceDemand` for the trips running on `date` (cached per date).
+
+    Returns None when no service runs on `date`.
+    """
+    date = pd.Timestamp(date).strftime("%Y-%m-%d")
+    service_ids = active_service_ids(date, gtfs_dir)
+    trips = load_trips(gtfs_dir)
+    day = np.isin(trips.service_id, service_ids)
+    if not day.any():
+        return None
+    block = chain_blocks(trips.departure[day], trips.arrival[day], trips.origin[day], trips.destination[day],
+                         min_layover)
+    n_blocks = int(block.max()) + 1
+    departure, arrival = trips.departure[day], trips.arrival[day]
+    peak = sum(np.clip(np.minimum(arrival, end) - np.maximum(departure, start), 0, None)
+               for start, end in PEAK_WINDOWS)
+    block_hours = np.bincount(block, weights=arrival - departure, minlength=n_blocks) / 3600
+    block_peak_hours = np.bincount(block, weights=peak, minlength=n_blocks) / 3600
+    return ServiceDemand(date, tuple(service_ids), int(day.sum()), n_blocks,
+                         math.ceil(n_blocks * spare_margin), block_hours, block_peak_hours)
@@ -0,0 +1,161 @@
+from dataclasses import dataclass, field
+from itertools import combinations
+from typing import Optional
+
+import numpy as np
+
+from .cleaning import CLEANING_TYPES, cleanable_count
+
+# Infeasibility diagnosis by counting. A night's constraints are the
+# selection count, the two per-trainset fitness rules (no open job card, a
+# clear Rolling-Stock certificate), for the assignment model the standby
+# quota and, with the cleaning stage, the night's free cleaning slots.
+# Whether a subset of them can hold together is a count over boolean masks,
+# so the minimal conflicting subsets and the cheapest relaxations are found
+# without running the GA.
+
+JOB_CARDS = "job cards"
+CERTIFICATES = "Rolling-Stock certificates"
+STANDBY_QUOTA = "standby quota"
+CLEANING_SLOTS = "cleaning slots"
+CARDINALITY = "selection count"
+
+
+@dataclass
+class Relaxation:
+    """One way to restore feasibility: `count` changes among `candidates`."""
+
+    description: str
+    count: int
+    candidates: list = field(default_factory=list)
+
+    def __str__(self):
+        if not self.candidates:
+            return self.description
+        return f"{self.description}: {', '.join(self.candidates)}"
+
+
+@dataclass
+class Diagnosis:
+    """Minimal conflicting constraint sets and independent relaxations."""
+
+    n_fleet: int
+    n_eligible: int
+    n_select: int
+    min_standby: int
+    conflicts: list
+    relaxations: list
+    n_cleanable: Optional[int] = None
+
+    @property
+    def feasible(self):
+        return not self.conflicts
+
+    def summary(self):
+        """Report lines for a supervisor."""
+        if self.feasible:
+            return [f"No conflict: {self.n_eligible} of {self.n_fleet} trainsets are eligible "
+                    f"for {self.n_select} places."]
+        lines = [f"{self.n_eligible} of {self.n_fleet} trainsets are eligible for {self.n_select} places"
+                 + (f" with {self.min_standby} on standby." if self.min_standby else ".")]
+        if self.n_cleanable is not None and self.n_cleanable < self.n_select:
+            lines.append(f"Only {self.n_cleanable} of the eligible trainsets fit the night's cleaning slots.")
+        lines += [f"Conflict: {' + '.join(conflict)}." for conflict in self.conflicts]
+        lines += [f"Fix: {relaxation}" for relaxation in self.relaxations]
+        return lines
+
+
+def _feasible(enforced, job_card_open, cert_invalid, n_select, min_standby, cleaning=None):
+    """Whether the enforced constraint families can hold together."""
+    blocked = np.zeros(len(job_card_open), dtype=bool)
+    if JOB_CARDS in enforced:
+        blocked |= job_card_open
+    if CERTIFICATES in enforced:
+        blocked |= cert_invalid
+    if np.count_nonzero(~blocked) < n_select:
+        return False
+    if CLEANING_SLOTS in enforced:
+        D, dedicated, full = cleaning
+        if cleanable_count(D[~blocked], dedicated, full) < n_select:
+            return False
+    return STANDBY_QUOTA not in enforced or len(blocked) - n_select >= min_standby
+
+
+def minimal_conflicts(job_card_open, cert_invalid, n_select, min_standby=0, cleaning=None):
+    """Minimal subsets of the constraint families that cannot hold with the selection count."""
+    families = ([JOB_CARDS, CERTIFICATES] + ([STANDBY_QUOTA] if min_standby else [])
+                + ([CLEANING_SLOTS] if cleaning is not None else []))
+    conflicts = []
+    for size in range(len(families) + 1):
+        for subset in combinations(families, size):
+            if any(set(found) <= set(subset) for found in conflicts):
+                continue
+            if not _feasible(subset, job_card_open, cert_invalid, n_select, min_standby, cleaning):
+                conflicts.append(subset)
+    return [(CARDINALITY,) + subset for subset in conflicts]
+
+
+def diagnose(df, n_select, min_standby=0, cleaning=None):
+    """`Diagnosis` of the night in `df` (the features table).
+
+    `cleaning` is the `cleaning.cleaning_capacity` triple over `df` when the
+    night's cleaning slots constrain the selection.
+    """
+    ids = df["trainsetId"].to_numpy(dtype=str)
+    job_card_open = df["job_card_open"].to_numpy(dtype=bool)
+    cert_invalid = ~df["fitness_certificate_valid"].to_numpy(dtype=bool)
+    n_fleet = len(ids)
+    n_eligible = int(np.count_nonzero(~job_card_open & ~cert_invalid))
+    conflicts = minimal_conflicts(job_card_open, cert_invalid, n_select, min_standby, cleaning)
+
+    relaxations = []
+    shortfall = n_select - n_eligible
+    if shortfall > 0:
+        relaxations.append(Relaxation(f"induct {n_eligible} instead of {n_select}", shortfall))
+        # Each trainset cleared adds one eligible; those with a single blocker
+        # need one clearance, those with both need two.
+        only_card, only_cert = job_card_open & ~cert_invalid, cert_invalid & ~job_card_open
+        both = job_card_open & cert_invalid
+        for mask, what in ((only_cert, "Rolling-Stock clearance"), (only_card, "their open job card closed")):
+            if np.count_nonzero(mask) >= shortfall:
+                relaxations.append(Relaxation(f"{shortfall} of these trains would need {what}", shortfall,
+                                              ids[mask].tolist()))
+        single = only_card | only_cert
+        n_single, n_blocked = int(np.count_nonzero(single)), int(np.count_nonzero(single | both))
+        if not relaxations[1:] and n_single >= shortfall:
+            relaxations.append(Relaxation(f"{shortfall} of these trains would need their one blocker cleared",
+                                          shortfall, ids[single].tolist()))
+        elif n_single < shortfall <= n_blocked:
+            n_double = shortfall - n_single
+            relaxations.append(Relaxation(
+                f"clear every single-blocker train and {n_double} of the trains with both an open job "
+                f"card and an uncleared certificate ({n_single + 2 * n_double} clearances)",
+                n_single + 2 * n_double, ids[single | both].tolist()))
+        elif n_blocked < shortfall:
+            relaxations.append(Relaxation(
+                f"the fleet has only {n_fleet} trainsets; clearing every one still leaves the count short",
+                shortfall))
+    excess = n_select + min_standby - n_fleet
+    if min_standby and excess > 0:
+        relaxations.append(Relaxation(f"hold {min_standby - excess} on standby instead of {min_standby}",
+                                      excess))
+        if shortfall <= 0:
+            relaxations.append(Relaxation(f"induct {n_select - excess} instead of {n_select}", excess))
+
+    n_cleanable = None
+    if cleaning is not None:
+        D, dedicated, full = cleaning
+        eligible = ~job_card_open & ~cert_invalid
+        n_cleanable = cleanable_count(D[eligible], dedicated, full)
+        missing = n_select - n_cleanable
+        if shortfall <= 0 < missing:
+            # Every extra full-service slot, or every cleaning deferred to a
+            # later night, lets one more eligible trainset in.
+            needing = eligible & D.any(axis=1)
+            relaxations.append(Relaxation(f"induct {n_cleanable} instead of {n_select}", missing))
+            relaxations.append(Relaxation(
+                f"open {missing} more full-service cleaning slots (free now: {int(full)} full-service, "
+                + ", ".join(f"{int(n)} {t}" for t, n in zip(CLEANING_TYPES, dedicated)) + ")", missing))
+            relaxations.append(Relaxation(f"defer the cleaning of {missing} of these trains", missing,
+                                          ids[needing].tolist()))
+    return Diagnosis(n_fleet, n_eligible, n_select, min_standby, conflicts, relaxations, n_cleanable)
@@ -0,0 +1,24 @@
+# Kept free of heavy imports so callers can catch engine errors without
+# loading numpy or pymoo.
+
+
+class InfeasibleNightError(ValueError):
+    """Too few trainsets are eligible for service to meet the selection target."""
+
+    def __init__(self, n_eligible, n_select, excluded_ids=(), diagnosis=None, n_cleanable=None):
+        self.n_eligible = n_eligible
+        self.n_select = n_select
+        # Eligible trainsets one plan can hold within the night's cleaning slots.
+        self.n_cleanable = n_cleanable
+        self.excluded_ids = list(excluded_ids)
+        # A `diagnose.Diagnosis` with the conflicting constraints and the fixes.
+        self.diagnosis = diagnosis
+        if n_eligible < n_select:
+            message = (f"Only {n_eligible} trainsets are eligible but {n_select} must be selected "
+                       f"({len(self.excluded_ids)} excluded by open job cards or invalid certificates).")
+        elif n_cleanable is not None and n_cleanable < n_select:
+            message = (f"Only {n_cleanable} of the {n_eligible} eligible trainsets fit the night's cleaning "
+                       f"slots but {n_select} must be selected.")
+        else:
+            message = f"Selecting {n_select} trainsets leaves too few for the standby quota."
+        super().__init__(message)
@@ -0,0 +1,183 @@
+import time
+from dataclasses import dataclass
+
+import numpy as np
+from scipy.optimize import Bounds, LinearConstraint, milp
+
+from .problem import W_BRANDING, W_CERT_INVALID, W_JOB_CARD_OPEN, W_MILEAGE, W_PUNCTUALITY
+
+# Exact Pareto front of TrainSchedulingProblemV3 by an epsilon-constraint loop
+# (Kirlik & Sayin's rectangle splitting). With the fleet size fixed to k, all
+# three objectives are linear in x:
+#
+#   f1 = mileage . x,   f2 = 100 - punctuality . x / k,   f3 = -branding . x
+#
+# The (f2, f3) plane is kept as a list of rectangles still to be searched.
+# For a rectangle with upper corner u we solve
+#
+#   min f1  s.t.  sum(x) = k,  f2 <= u2 - eps,  f3 <= u3 - eps
+#
+# then break ties by minimising f2 + f3 with f1 fixed, which makes the answer
+# non-dominated. A new point splits every rectangle it falls into; rectangles
+# whose MILP is infeasible or would return a known point are discarded. When
+# no rectangles remain the front is complete. Only a MILP proven optimal gives
+# a point and only one proven infeasible prunes; a MILP that hits the time
+# limit first stops the loop with the front incomplete.
+
+MILP_OPTIMAL = 0     # scipy.optimize.milp status codes
+MILP_INFEASIBLE = 2
+
+
+@dataclass
+class ExactFront:
+    X: np.ndarray
+    F: np.ndarray
+    n_solves: int
+    elapsed: float
+    complete: bool
+
+
+def objective_coefficients(problem):
+    """(3, n_var) coefficients C and (3,) constants c0 with F = x @ C.T + c0."""
+    W = problem.W
+    C = np.stack([W[:, W_MILEAGE], -W[:, W_PUNCTUALITY] / problem.n_select, -W[:, W_BRANDING]])
+    c0 = np.array([0.0, 100.0, 0.0])
+    return C, c0
+
+
+def _split(lower, upper, z):
+    """Cut the rectangle [lower, upper) at z along every axis z falls inside."""
+    pieces = [(lower, upper)]
+    for j in range(len(z)):
+        if not lower[j] < z[j] < upper[j]:
+            continue
+        cut = []
+        for lo, up in pieces:
+            left_up, right_lo = up.copy(), lo.copy()
+            left_up[j] = right_lo[j] = z[j]
+            cut += [(lo, left_up), (right_lo, up)]
+        pieces = cut
+    return pieces
+
+
+class _EpsilonConstraintMILP:
+    def __init__(self, problem, tol):
+        self.k, self.n = problem.n_select, problem.n_var
+        self.C, self.c0 = objective_coefficients(problem)
+        s = np.sort(self.C, axis=1)
+        self.lo = s[:, :self.k].sum(axis=1) + self.c0
+        self.hi = s[:, -self.k:].sum(axis=1) + self.c0
+        # One natural unit (km, %, score) is the smallest range we resolve, so a
+        # constant objective does not shrink eps to numerical noise.
+        self.scale = np.maximum(self.hi - self.lo, 1.0)
+        self.eps = tol * self.scale
+        ineligible = (problem.W[:, W_JOB_CARD_OPEN] > 0) | (problem.W[:, W_CERT_INVALID] > 0)
+        self.bounds = Bounds(np.zeros(self.n), np.where(ineligible, 0.0, 1.0))
+        self.n_eligible = int((~ineligible).sum())
+        self.n_solves = 0
+
+    def _milp(self, cost, rows, ub, time_limit):
+        A = np.vstack([np.ones(self.n)] + rows)
+        lb = np.full(len(A), -np.inf)
+        lb[0] = self.k
+        ub = np.concatenate([[self.k], ub])
+        self.n_solves += 1
+        res = milp(cost, constraints=LinearConstraint(A, lb, ub), integrality=np.ones(self.n),
+                   bounds=self.bounds, options={"time_limit": max(time_limit, 1e-3), "mip_rel_gap": 0.0})
+        return res.status, None if res.x is None else res.x > 0.5
+
+    def solve(self, u, time_limit):
+        """Lexicographic min of f1 then f2 + f3 with f2, f3 strictly below u.
+
+        Returns (status, x): MILP_OPTIMAL with the point, MILP_INFEASIBLE
+        when nothing is feasible below u, otherwise the status of the MILP
+        that stopped before proving either (x is then None).
+        """
+        C, c0 = self.C, self.c0
+        ub = u - c0[1:] - self.eps[1:]
+        status, x = self._milp(C[0], [C[1], C[2]], ub, time_limit)
+        if status != MILP_OPTIMAL:
+            return status, None
+        f1 = x @ C[0]
+        tie_break = C[1] / self.scale[1] + C[2] / self.scale[2]
+        status, x2 = self._milp(tie_break, [C[1], C[2], C[0]], np.append(ub, f1 + 1e-7 * self.scale[0]),
+                                time_limit)
+        if status == MILP_OPTIMAL:
+            return status, x2
+        # x itself is feasible, so an infeasible tie-break is numerical noise.
+        return (MILP_OPTIMAL, x) if status == MILP_INFEASIBLE else (status, None)
+
+
+def solve_exact(problem, tol=1e-5, max_points=1000, time_limit=60.0):
+    """Enumerate the non-dominated set of `problem` exactly.
+
+    `tol` is the minimum improvement (relative to each objective's range)
+    that separates two distinct front points. The loop stops early, with
+    `complete=False`, after `max_points` points or `time_limit` seconds.
+    """
+    start = time.perf_counter()
+    sub = _EpsilonConstraintMILP(problem, tol)
+    n_obj = len(sub.C)
+
+    X_found, F_found = [], []
+    if sub.n_eligible < sub.k:
+        rectangles = []
+    else:
+        rectangles = [(sub.lo[1:].copy(), sub.hi[1:] + 2 * sub.eps[1:])]
+
+    while rectangles and len(F_found) < max_points:
+        remaining = time_limit - (time.perf_counter() - start)
+        if remaining <= 0:
+            break
+
+        volumes = [np.prod(up - lo) for lo, up in rectangles]
+        lower, upper = rectangles[int(np.argmax(volumes))]
+        status, x = sub.solve(upper, remaining)
+
+        if status == MILP_INFEASIBLE:
+            # Nothing feasible below `upper`, so nothing below any smaller corner.
+            rectangles = [(lo, up) for lo, up in rectangles if not np.all(up <= upper)]
+            continue
+        if status != MILP_OPTIMAL:
+            # Stopped (time limit) without a proof: the rectangle stays unsearched.
+            break
+
+        f = x @ sub.C.T + sub.c0
+        z = f[1:]
+        is_new = not any(np.all(np.abs(f - g) <= sub.eps) for g in F_found)
+        if is_new:
+            X_found.append(x)
+            F_found.append(f)
+            rectangles = [piece for lo, up in rectangles for piece in _split(lo, up, z)]
+        # Any rectangle whose corner lies above z and inside `upper` would
+        # return the same point again.
+        rectangles = [(lo, up) for lo, up in rectangles
+                      if not (np.all(z < up - 0.5 * sub.eps[1:]) and np.all(up <= upper))]
+
+    X = np.array(X_found, dtype=bool).reshape(-1, sub.n)
+    F = np.array(F_found).reshape(-1, n_obj)
+    return ExactFront(X, F, sub.n_solves, time.perf_counter() - start, complete=not rectangles)
+
+
+def front_gap(F_approx, F_exact, tol=1e-6):
+    """How far an approximate front (e.g. NSGA2's res.F) is from the exact one.
+
+    Distances are measured after scaling each objective by the exact front's
+    range. Returns GD (mean distance from approximate points to the exact
+    front), IGD (mean distance from exact points to the approximation) and
+    how many exact points the approximation recovered.
+    """
+    F_approx = np.atleast_2d(np.asarray(F_approx, dtype=np.float64))
+    F_exact = np.atleast_2d(np.asarray(F_exact, dtype=np.float64))
+    lo, hi = F_exact.min(axis=0), F_exact.max(axis=0)
+    scale = np.where(hi - lo > 0, hi - lo, 1.0)
+    A = (F_approx - lo) / scale
+    E = (F_exact - lo) / scale
+    D = np.linalg.norm(A[:, None, :] - E[None, :, :], axis=2)
+    return {
+        "gd": float(D.min(axis=1).mean()),
+        "igd": float(D.min(axis=0).mean()),
+        "recovered": int((D.min(axis=0) <= tol).sum()),
+        "n_exact": len(E),
+        "n_approx": len(A),
+    }
@@ -0,0 +1,89 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .presolve import eligibility_mask
+from .problem import W_BRANDING, W_CERT_INVALID, W_JOB_CARD_OPEN, W_MILEAGE, W_PUNCTUALITY, build_weight_matrix
+
+# Closed-form explanation of a v2/v3 front. Every objective is a sum over the
+# selected trainsets, so a trainset's contribution is its own term, and
+# swapping one trainset for another changes each objective by the difference
+# of their terms. Contributions, swap deltas and the best alternatives for
+# every solution on the front come out of a few array reductions.
+
+
+def contributions(df, n_select, n_obj=3):
+    """(n_trainsets, n_obj) term each trainset adds to each minimised objective.
+
+    Summed over a selection of `n_select` trainsets the terms give F exactly:
+    mileage, (100 - punctuality) / n_select and -branding priority.
+    """
+    W = build_weight_matrix(df)
+    C = np.column_stack([W[:, W_MILEAGE], (100 - W[:, W_PUNCTUALITY]) / n_select, -W[:, W_BRANDING]])
+    return C[:, :n_obj]
+
+
+def binding_constraints(df):
+    """Why each trainset cannot be selected, or "" when it is eligible."""
+    W = build_weight_matrix(df)
+    reasons = np.stack([np.where(W[:, W_JOB_CARD_OPEN] > 0, "open job card", ""),
+                        np.where(W[:, W_CERT_INVALID] > 0, "invalid Rolling-Stock certificate", "")], axis=1)
+    return np.array(["; ".join(r for r in row if r) for row in reasons], dtype=object)
+
+
+@dataclass
+class Explanation:
+    """Per-trainset explanation of every solution of a front.
+
+    `contribution[t, j]` is trainset t's term in objective j (minimised, as
+    in F). For solution i, `swap_delta[i, t, j]` is the change in objective j
+    from the best single swap involving t: a selected trainset swapped out
+    for the best excluded eligible trainset for j (`alternative[i, j]`), an
+    excluded eligible one swapped in for the selected trainset that is worst
+    for j (`replaced[i, j]`). Positive deltas make the objective worse; NaN
+    marks trainsets that cannot be selected, with the reason in `binding`.
+    """
+
+    trainset_ids: np.ndarray
+    objective_names: tuple
+    selected: np.ndarray
+    contribution: np.ndarray
+    swap_delta: np.ndarray
+    alternative: np.ndarray
+    replaced: np.ndarray
+    binding: np.ndarray
+
+    def __len__(self):
+        return len(self.selected)
+
+    def to_frame(self, i):
+        """One row per trainset for solution `i`, selected trainsets first."""
+        frame = pd.DataFrame({"trainsetId": self.trainset_ids, "selected": self.selected[i]})
+        for j, name in enumerate(self.objective_names):
+            frame[f"{name}_contribution"] = self.contribution[:, j]
+            frame[f"{name}_swap_delta"] = self.swap_delta[i, :, j]
+            partner = np.where(self.selected[i], self.alternative[i, j], self.replaced[i, j])
+            frame[f"{name}_swap_with"] = np.where(partner >= 0, self.trainset_ids[np.maximum(partner, 0)], None)
+        frame["binding_constraint"] = self.binding
+        return frame.sort_values("selected", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def explain_front(df, X, n_select, objective_names):
+    """`Explanation` of the selections X (n_solutions, n_trainsets) over `df`."""
+    X = np.atleast_2d(np.asarray(X, dtype=bool))
+    C = contributions(df, n_select, len(objective_names))
+    eligible = eligibility_mask(df)
+    excluded = ~X & eligible
+
+    # Best excluded term and worst selected term per solution and objective.
+    out_terms = np.where(excluded[:, :, None], C[None], np.inf)
+    in_terms = np.where(X[:, :, None], C[None], -np.inf)
+    alternative = np.where(excluded.any(axis=1)[:, None], out_terms.argmin(axis=1), -1)
+    replaced = np.where(X.any(axis=1)[:, None], in_terms.argmax(axis=1), -1)
+    best_out, worst_in = out_terms.min(axis=1), in_terms.max(axis=1)
+
+    swap_delta = np.where(X[:, :, None], best_out[:, None, :] - C[None], C[None] - worst_in[:, None, :])
+    swap_delta = np.where(eligible[None, :, None] & np.isfinite(swap_delta), swap_delta, np.nan)
+    return Explanation(df["trainsetId"].to_numpy(dtype=str), tuple(objective_names), X, C, swap_delta,
+                       alternative, replaced, binding_constraints(df))
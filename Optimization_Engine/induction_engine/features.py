@@ -0,0 +1,187 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+# Feature preparation shared by the v2 and v3 engines: one row per trainset
+# with mileage, open job card, job-card count, Rolling-Stock certificate
+# validity, branding priority and the derived punctuality score. The materialised table is
+# cached as `.npz` under a key built from the source files' content hashes
+# (and the branding reference date), so repeated runs skip parsing/merging.
+# The branding file is optional: without it every branding score is 0, as
+# the v2 engine never read it.
+#
+# The data, GTFS and cache directories default to the KMRL_DATA_DIR,
+# KMRL_GTFS_DIR and KMRL_CACHE_DIR environment variables and otherwise, in a
+# source checkout only, to the checkout's folders. An installed package has
+# no default data directory, and without KMRL_CACHE_DIR it does not cache.
+
+DATA_DIR_ENV = "KMRL_DATA_DIR"
+GTFS_DIR_ENV = "KMRL_GTFS_DIR"
+CACHE_DIR_ENV = "KMRL_CACHE_DIR"
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+# The engine's pyproject.toml sits next to the package only in a checkout.
+IN_CHECKOUT = os.path.exists(os.path.join(REPO_ROOT, "Optimization_Engine", "pyproject.toml"))
+
+
+def default_dir(env, *checkout_parts):
+    """`env` when set, else the checkout folder `checkout_parts`, else None."""
+    if os.environ.get(env):
+        return os.environ[env]
+    return os.path.join(REPO_ROOT, *checkout_parts) if IN_CHECKOUT else None
+
+
+def source_path(directory, name, env=DATA_DIR_ENV):
+    """`name` inside `directory`; raises FileNotFoundError when no directory is configured."""
+    if directory is None:
+        raise FileNotFoundError(f"No directory configured for {name}: pass it explicitly or set {env}.")
+    return os.path.join(directory, name)
+
+
+DATA_DIR = default_dir(DATA_DIR_ENV, "ArtificialData")
+CACHE_DIR = default_dir(CACHE_DIR_ENV, "Optimization_Engine", "cache", "features")
+
+SOURCE_FILES = ("trainsets.csv", "health_and_maintenance.csv", "branding_priorities.csv")
+OPTIONAL_FILES = ("branding_priorities.csv",)
+OPEN_JOB_CARD_STATUSES = ["Open", "In Progress"]  # 'Pending Review' is OK
+FEATURE_VERSION = "2"  # bump when build_features changes its output
+
+
+def file_digest(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cache_key(data_dir, today):
+    h = hashlib.sha256(FEATURE_VERSION.encode())
+    for name in SOURCE_FILES:
+        path = os.path.join(data_dir, name)
+        if name in OPTIONAL_FILES and not os.path.exists(path):
+            h.update(f"missing:{name}".encode())
+            continue
+        h.update(file_digest(path).encode())
+    h.update(today.strftime("%Y-%m-%d").encode())
+    return h.hexdigest()[:32]
+
+
+def summarise_health(hm_df):
+    """Single-pass pivot of the long health & maintenance log by trainsetId."""
+    category = hm_df["category"]
+    is_rs_cert = (category == "Fitness Certificate") & (hm_df["department"] == "Rolling-Stock")
+    flags = pd.DataFrame({
+        "trainsetId": hm_df["trainsetId"],
+        "mileage": hm_df["value"].where(category == "Mileage"),
+        "job_card_open": (category == "Job Card") & hm_df["status"].isin(OPEN_JOB_CARD_STATUSES),
+        "n_job_cards": category == "Job Card",
+        "n_rs_certs": is_rs_cert,
+        # Only an explicit isClear == False fails a certificate.
+        "n_rs_not_clear": is_rs_cert & hm_df["isClear"].eq(False),
+    })
+    summary = flags.groupby("trainsetId", sort=False).agg(
+        mileage=("mileage", "last"),
+        job_card_open=("job_card_open", "any"),
+        n_job_cards=("n_job_cards", "sum"),
+        n_rs_certs=("n_rs_certs", "sum"),
+        n_rs_not_clear=("n_rs_not_clear", "sum"),
+    )
+    # Rule: only the Rolling-Stock certificate must be clear; a missing one is not valid.
+    summary["fitness_certificate_valid"] = (summary["n_rs_certs"] > 0) & (summary["n_rs_not_clear"] == 0)
+    return summary[["mileage", "job_card_open", "n_job_cards", "fitness_certificate_valid"]]
+
+
+def branding_priority(branding_df, today):
+    """Contract hours still owed per day left; expired contracts get 9999."""
+    end = pd.to_datetime(branding_df["endDate"])
+    days_to_expiry = (end - today).dt.days
+    hours_remaining = branding_df["contractualHoursRequired"] - branding_df["hoursExposedToDate"]
+    score = hours_remaining / days_to_expiry.clip(lower=1)
+    score = score.where(days_to_expiry > 0, 9999)
+    return score.groupby(branding_df["trainsetId"]).max()
+
+
+def build_features(train_df, hm_df, branding_df, today):
+    """The feature table; `branding_df` may be None when there is no branding data."""
+    features = train_df.join(summarise_health(hm_df), on="trainsetId")
+    if branding_df is None:
+        features["branding_priority_score"] = 0.0
+    else:
+        features["branding_priority_score"] = features["trainsetId"].map(branding_priority(branding_df, today))
+
+    # If a train has no job cards, it has no open ones. If it is missing a
+    # Rolling-Stock cert, it is not valid.
+    features["job_card_open"] = features["job_card_open"].fillna(False).astype(bool)
+    features["fitness_certificate_valid"] = features["fitness_certificate_valid"].fillna(False).astype(bool)
+    features["n_job_cards"] = features["n_job_cards"].fillna(0).astype(np.int64)
+    features["branding_priority_score"] = features["branding_priority_score"].fillna(0)
+
+    return add_mileage_scores(features)
+
+
+def add_mileage_scores(features):
+    """(Re)derive `mileage_norm` and `punctuality_score` from the fleet's mileage range."""
+    min_mileage, max_mileage = features["mileage"].min(), features["mileage"].max()
+    features["mileage_norm"] = (features["mileage"] - min_mileage) / (max_mileage - min_mileage)
+    features["punctuality_score"] = (100 - features["mileage_norm"] * 5).round(2)
+    return features
+
+
+def save_table(df, path):
+    """Write a DataFrame column by column to `.npz` (no pickling)."""
+    arrays = {}
+    for i, column in enumerate(df.columns):
+        values = df[column]
+        if values.dtype.kind in "biuf":
+            arrays[f"c{i}"] = values.to_numpy()
+        else:
+            arrays[f"c{i}"] = values.fillna("").astype(str).to_numpy(dtype=str)
+            arrays[f"n{i}"] = values.isna().to_numpy()
+    arrays["columns"] = np.array(df.columns, dtype=str)
+    tmp = f"{path}.tmp.npz"
+    np.savez(tmp, **arrays)
+    os.replace(tmp, path)
+
+
+def load_table(path):
+    with np.load(path, allow_pickle=False) as data:
+        columns = {}
+        for i, column in enumerate(data["columns"]):
+            values = data[f"c{i}"]
+            if f"n{i}" in data:
+                values = pd.Series(values).mask(data[f"n{i}"])
+            columns[str(column)] = values
+    return pd.DataFrame(columns)
+
+
+def load_features(data_dir=DATA_DIR, cache_dir=CACHE_DIR, today=None):
+    """The per-trainset feature table, from cache when the sources are unchanged.
+
+    Pass `cache_dir=None` to always rebuild. Raises FileNotFoundError when
+    no data directory is configured or trainsets.csv or
+    health_and_maintenance.csv is missing; without branding_priorities.csv
+    every branding score is 0.
+    """
+    source_path(data_dir, "trainsets.csv")
+    today = pd.Timestamp.now(tz="UTC") if today is None else pd.Timestamp(today)
+    if today.tzinfo is None:
+        today = today.tz_localize("UTC")
+
+    path = None
+    if cache_dir is not None:
+        path = os.path.join(cache_dir, f"features-{cache_key(data_dir, today)}.npz")
+        if os.path.exists(path):
+            return load_table(path)
+
+    train_df = pd.read_csv(source_path(data_dir, "trainsets.csv"))
+    hm_df = pd.read_csv(source_path(data_dir, "health_and_maintenance.csv"))
+    branding_path = source_path(data_dir, "branding_priorities.csv")
+    branding_df = pd.read_csv(branding_path) if os.path.exists(branding_path) else None
+    features = build_features(train_df, hm_df, branding_df, today)
+
+    if path is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        save_table(features, path)
+    return features
@@ -0,0 +1,104 @@
+import numpy as np
+from pymoo.core.callback import Callback
+from pymoo.util.nds.non_dominated_sorting import NonDominatedSorting
+
+
+class HistoryRecorder(Callback):
+    """Per-generation objective history in a fixed-size ring buffer.
+
+    Blocks of up to `max_rows` objective vectors are written into a
+    preallocated (capacity, max_rows, n_obj) array, in memory or, when `path`
+    is given, in a memory-mapped `.npy` file. Once `capacity` blocks are
+    stored the oldest are overwritten, so memory never grows with the run.
+
+    `every` keeps only every k-th generation and `non_dominated_only` keeps
+    only each generation's non-dominated points. Read the history back with
+    `iter_blocks()` (or plain iteration), which yields one block at a time.
+    """
+
+    def __init__(self, n_obj, max_rows, capacity=400, every=1, non_dominated_only=False, path=None):
+        super().__init__()
+        self.n_obj = n_obj
+        self.max_rows = max_rows
+        self.capacity = capacity
+        self.every = every
+        self.non_dominated_only = non_dominated_only
+        self.path = path
+        shape = (capacity, max_rows, n_obj)
+        if path is None:
+            self.buffer = np.empty(shape, dtype=np.float64)
+        else:
+            self.buffer = np.lib.format.open_memmap(path, mode="w+", dtype=np.float64, shape=shape)
+        self.counts = np.zeros(capacity, dtype=np.int64)
+        self.generations = np.zeros(capacity, dtype=np.int64)
+        self.n_written = 0
+        self.lower = np.full(n_obj, np.inf)
+        self.upper = np.full(n_obj, -np.inf)
+
+    def notify(self, algorithm):
+        if (algorithm.n_gen - 1) % self.every:
+            return
+        self.record(algorithm.n_gen, algorithm.pop.get("F"))
+
+    def record(self, generation, F):
+        F = np.asarray(F, dtype=np.float64)
+        if self.non_dominated_only and len(F):
+            F = F[NonDominatedSorting().do(F, only_non_dominated_front=True)]
+        F = F[:self.max_rows]
+
+        slot = self.n_written % self.capacity
+        self.buffer[slot, :len(F)] = F
+        self.counts[slot] = len(F)
+        self.generations[slot] = generation
+        self.n_written += 1
+        if len(F):
+            np.minimum(self.lower, F.min(axis=0), out=self.lower)
+            np.maximum(self.upper, F.max(axis=0), out=self.upper)
+
+    def __len__(self):
+        return min(self.n_written, self.capacity)
+
+    @property
+    def n_points(self):
+        """Number of objective vectors currently held."""
+        return int(self.counts.sum())
+
+    def iter_blocks(self):
+        """Yield (generation, F) per stored block, oldest first.
+
+        Each F is a view into the buffer; copy it if it must outlive the
+        recorder or survive further recording.
+        """
+        first = self.n_written - len(self)
+        for i in range(first, self.n_written):
+            slot = i % self.capacity
+            yield int(self.generations[slot]), self.buffer[slot, :self.counts[slot]]
+
+    def __iter__(self):
+        return self.iter_blocks()
+
+    def flush(self):
+        """Persist a memory-mapped history and its block index to disk."""
+        if self.path is None:
+            raise ValueError("Only a recorder created with `path` can be flushed.")
+        self.buffer.flush()
+        np.savez(f"{self.path}.index.npz", counts=self.counts, generations=self.generations,
+                 n_written=self.n_written, lower=self.lower, upper=self.upper,
+                 every=self.every, non_dominated_only=self.non_dominated_only)
+
+    @classmethod
+    def load(cls, path):
+        """Re-open a flushed history read-only, without loading it into memory."""
+        index = np.load(f"{path}.index.npz")
+        recorder = cls.__new__(cls)
+        Callback.__init__(recorder)
+        recorder.buffer = np.load(path, mmap_mode="r")
+        recorder.capacity, recorder.max_rows, recorder.n_obj = recorder.buffer.shape
+        recorder.path = path
+        recorder.counts = index["counts"]
+        recorder.generations = index["generations"]
+        recorder.n_written = int(index["n_written"])
+        recorder.lower, recorder.upper = index["lower"], index["upper"]
+        recorder.every = int(index["every"])
+        recorder.non_dominated_only = bool(index["non_dominated_only"])
+        return recorder
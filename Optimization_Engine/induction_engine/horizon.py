@@ -0,0 +1,141 @@
+import numpy as np
+from pymoo.core.crossover import Crossover
+from pymoo.core.mutation import Mutation
+from pymoo.core.problem import Problem
+from pymoo.core.repair import Repair
+from pymoo.core.sampling import Sampling
+
+from .operators import random_k_hot, repair_to_k, swap_mutation, top_k_mask
+from .problem import N_TO_SELECT, W_BRANDING, W_MILEAGE, W_PUNCTUALITY, build_weight_matrix
+
+# Rolling horizon: the next `n_nights` nights are planned together as a
+# (n_nights, n_trainsets) binary tensor, flattened night-major into one
+# chromosome. Mileage and branding exposure carry forward from night to night
+# through cumulative sums over the night axis, so a whole population is
+# evaluated with array operations over (pop, nights, trainsets) and no loops.
+# Only the first night is committed; the next run re-plans from fresh data.
+
+N_NIGHTS = 7
+SERVICE_KM = 450.0    # distance one trainset runs in a revenue service day
+SERVICE_HOURS = 16.0  # branding exposure hours of one revenue service day
+EXPIRED_BRANDING = 9999  # `features.branding_priority` score of an expired contract
+HORIZON_OBJECTIVE_NAMES = ("mileage_variance", "punctuality", "branding_shortfall")
+
+
+def as_tensor(X, n_nights):
+    """(pop, n_nights, n_trainsets) view of flattened horizon chromosomes."""
+    X = np.atleast_2d(np.asarray(X))
+    return X.reshape(len(X), n_nights, -1)
+
+
+class HorizonProblem(Problem):
+    """Select n_select trainsets on each of `n_nights` nights.
+
+    Objectives: variance of fleet mileage after the horizon, 100 - mean
+    punctuality of every night's selection, and branding shortfall: the
+    exposure hours each contract is behind its pro-rata target, summed over
+    the nights. Constraint: exactly n_select trainsets every night.
+    """
+
+    def __init__(self, df, n_select=N_TO_SELECT, n_nights=N_NIGHTS, service_km=SERVICE_KM,
+                 service_hours=SERVICE_HOURS):
+        super().__init__(n_var=n_nights * len(df), n_obj=3, n_constr=1, xl=0, xu=1, vtype=bool)
+        self.df = df
+        self.n_select = n_select
+        self.n_nights = n_nights
+        self.service_km = service_km
+        self.service_hours = service_hours
+        W = build_weight_matrix(df)
+        self.mileage = W[:, W_MILEAGE]
+        self.punctuality = W[:, W_PUNCTUALITY]
+        # Hours per day each contract needs (0 once expired), accumulated night by night.
+        owed = np.where(W[:, W_BRANDING] >= EXPIRED_BRANDING, 0.0, W[:, W_BRANDING])
+        self.branding_target = np.arange(1, n_nights + 1)[:, None] * owed[None, :]
+        self.n_evaluated = 0
+        self.n_infeasible = 0
+
+    def _evaluate(self, x, out, *args, **kwargs):
+        R = as_tensor(x, self.n_nights).astype(np.float64)
+        runs = R.sum(axis=1)
+
+        f1 = (self.mileage + self.service_km * runs).var(axis=1)
+        f2 = 100 - runs @ self.punctuality / (self.n_nights * self.n_select)
+        exposure = self.service_hours * np.cumsum(R, axis=1)
+        f3 = np.maximum(self.branding_target - exposure, 0).sum(axis=(1, 2))
+        g1 = ((R.sum(axis=2) - self.n_select) ** 2).sum(axis=1)
+        self.n_evaluated += len(R)
+        self.n_infeasible += int(np.count_nonzero(g1 > 0))
+        out["F"] = np.column_stack([f1, f2, f3])
+        out["G"] = g1[:, None]
+
+
+# Operators: every night block is a k-hot row, so the fixed-cardinality
+# helpers run on the (pop * n_nights, n_trainsets) reshape of the population.
+
+def _blocks(X, n_nights):
+    X = np.asarray(X)
+    return X.reshape(-1, X.shape[-1] // n_nights)
+
+
+class HorizonSampling(Sampling):
+    def __init__(self, k, n_nights):
+        super().__init__()
+        self.k = k
+        self.n_nights = n_nights
+
+    def _do(self, problem, n_samples, *args, random_state=None, **kwargs):
+        blocks = random_k_hot(n_samples * self.n_nights, problem.n_var // self.n_nights, self.k, random_state)
+        return blocks.reshape(n_samples, problem.n_var)
+
+
+class HorizonCrossover(Crossover):
+    """Fixed-cardinality crossover applied night by night."""
+
+    def __init__(self, k, n_nights, prob=0.9, **kwargs):
+        super().__init__(2, 2, prob=prob, **kwargs)
+        self.k = k
+        self.n_nights = n_nights
+
+    def _do(self, problem, X, *args, random_state=None, **kwargs):
+        a, b = _blocks(X[0], self.n_nights).astype(bool), _blocks(X[1], self.n_nights).astype(bool)
+        shared = a & b
+        either = a ^ b
+        offspring = []
+        for _ in range(self.n_offsprings):
+            keys = np.where(shared, 2.0, np.where(either, random_state.random(a.shape), -1.0))
+            offspring.append(top_k_mask(keys, self.k).reshape(X.shape[1], -1))
+        return np.stack(offspring)
+
+
+class HorizonMutation(Mutation):
+    """Swap selected and unselected trainsets within every night."""
+
+    def __init__(self, n_nights, n_swaps=1, prob=1.0, **kwargs):
+        super().__init__(prob=prob, **kwargs)
+        self.n_nights = n_nights
+        self.n_swaps = n_swaps
+
+    def _do(self, problem, X, *args, random_state=None, **kwargs):
+        return swap_mutation(_blocks(X, self.n_nights), self.n_swaps, random_state).reshape(X.shape)
+
+
+class HorizonRepair(Repair):
+    def __init__(self, k, n_nights):
+        super().__init__()
+        self.k = k
+        self.n_nights = n_nights
+
+    def _do(self, problem, X, random_state=None, **kwargs):
+        if random_state is None:
+            random_state = np.random.default_rng()
+        return repair_to_k(_blocks(X, self.n_nights), self.k, random_state).reshape(np.shape(X))
+
+
+def horizon_operators(k, n_nights, n_swaps=1):
+    """Keyword arguments that keep a pymoo GA on k-hot nights."""
+    return dict(
+        sampling=HorizonSampling(k, n_nights),
+        crossover=HorizonCrossover(k, n_nights),
+        mutation=HorizonMutation(n_nights, n_swaps=n_swaps),
+        repair=HorizonRepair(k, n_nights),
+    )
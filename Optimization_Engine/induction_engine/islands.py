@@ -0,0 +1,164 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+from pymoo.algorithms.moo.nsga2 import NSGA2
+from pymoo.core.callback import Callback
+from pymoo.core.termination import TerminateIfAny
+from pymoo.optimize import minimize
+from pymoo.termination.max_gen import MaximumGenerationTermination
+from pymoo.termination.max_time import TimeBasedTermination
+from pymoo.util.nds.non_dominated_sorting import NonDominatedSorting
+
+from .operators import fixed_cardinality_operators, random_k_hot
+
+# Island model: several NSGA2 populations with different seeds evolve in
+# parallel worker processes. Every `migration_interval` generations each
+# island sends its best `n_migrants` individuals to the next island in a
+# ring, where they replace the worst ones. NSGA2's state between epochs is
+# just its population, so an epoch is a fresh `minimize` call seeded with it.
+# With a history recorder, workers send back their populations' objectives
+# for the recorded generations and the parent writes them into it. With a
+# `HypervolumeTermination`, the merged front is observed after every epoch
+# and its `max_time` also caps the epochs running in the workers.
+
+
+@dataclass
+class IslandResult:
+    X: np.ndarray
+    F: np.ndarray
+    n_islands: int
+    n_gen: int
+    n_evals: int
+    elapsed: float
+    n_infeasible: int = 0
+    termination: object = None
+
+
+class _CollectHistory(Callback):
+    """Objectives of every `every`-th generation of one epoch, numbered from `offset`."""
+
+    def __init__(self, offset, every):
+        super().__init__()
+        self.offset = offset
+        self.every = every
+        self.blocks = []
+
+    def notify(self, algorithm):
+        generation = self.offset + algorithm.n_gen
+        if (generation - 1) % self.every == 0:
+            self.blocks.append((generation, algorithm.pop.get("F").copy()))
+
+
+def _evolve(problem, X, k, pop_size, n_gen, seed, offset=0, every=None, max_time=None):
+    operators = fixed_cardinality_operators(k)
+    if X is not None:
+        operators["sampling"] = X
+    algorithm = NSGA2(pop_size=pop_size, eliminate_duplicates=True, **operators)
+    n_infeasible = problem.n_infeasible
+    termination = MaximumGenerationTermination(n_gen)
+    if max_time is not None:
+        termination = TerminateIfAny(termination, TimeBasedTermination(max_time))
+    callback = {} if every is None else {"callback": _CollectHistory(offset, every)}
+    res = minimize(problem, algorithm, termination, seed=seed, **callback)
+    pop = res.pop
+    blocks = [] if every is None else res.algorithm.callback.blocks
+    return (pop.get("X").astype(bool), pop.get("F"), pop.get("CV")[:, 0], res.algorithm.evaluator.n_eval,
+            problem.n_infeasible - n_infeasible, blocks, res.algorithm.n_gen)
+
+
+def _rank(F, CV):
+    """Lower is better: feasible points by non-dominated front, then by CV."""
+    rank = np.empty(len(F))
+    feasible = CV <= 0
+    if feasible.any():
+        fronts = NonDominatedSorting().do(F[feasible])
+        r = np.empty(feasible.sum())
+        for i, front in enumerate(fronts):
+            r[front] = i
+        rank[feasible] = r
+    rank[~feasible] = len(F) + CV[~feasible]
+    return rank
+
+
+def _fill(X, pop_size, k, rng):
+    """Drop duplicate rows and top up with random k-hot rows."""
+    X = np.unique(X, axis=0)[:pop_size]
+    if len(X) < pop_size:
+        X = np.vstack([X, random_k_hot(pop_size - len(X), X.shape[1], k, rng)])
+    return X
+
+
+def merge_fronts(X, F, CV=None):
+    """Non-dominated, de-duplicated feasible rows of the stacked islands."""
+    if CV is not None:
+        X, F = X[CV <= 0], F[CV <= 0]
+    if len(F) == 0:
+        return X, F
+    nd = NonDominatedSorting().do(F, only_non_dominated_front=True)
+    X, F = X[nd], F[nd]
+    _, keep = np.unique(X, axis=0, return_index=True)
+    keep = np.sort(keep)
+    return X[keep], F[keep]
+
+
+def run_islands(problem, k, n_islands=None, pop_size=200, n_gen=400, migration_interval=20,
+                n_migrants=10, seed=1, max_workers=None, history=None, termination=None, initial=None):
+    """Run `n_islands` NSGA2 populations in parallel and merge their fronts.
+
+    With `history`, a `HistoryRecorder`, each island's recorded generations
+    are written into it as separate blocks. With `termination`, a
+    `HypervolumeTermination`, the run stops between epochs once the merged
+    front converges or its `max_time` passes. `initial` holds one starting
+    population per island (e.g. from a warm start).
+    """
+    start = time.perf_counter()
+    n_islands = n_islands or os.cpu_count() or 1
+    rng = np.random.default_rng(seed)
+    populations = [None] * n_islands if initial is None else list(initial)
+    n_evals = n_infeasible = n_done = 0
+    every = None if history is None else history.every
+    if termination is not None and termination.start is None:
+        termination.start = start
+
+    with ProcessPoolExecutor(max_workers=max_workers or n_islands) as pool:
+        for epoch, done in enumerate(range(0, n_gen, migration_interval)):
+            n = min(migration_interval, n_gen - done)
+            remaining = None
+            if termination is not None and termination.max_time is not None:
+                remaining = termination.max_time - termination.elapsed
+            futures = [
+                pool.submit(_evolve, problem, populations[i], k, pop_size, n, seed + 1000 * i + epoch, done, every,
+                            remaining)
+                for i in range(n_islands)
+            ]
+            results = [f.result() for f in futures]
+            n_evals += sum(r[3] for r in results)
+            n_infeasible += sum(r[4] for r in results)
+            n_done = done + max(r[6] for r in results)
+            if history is not None:
+                for *_, blocks, _ in results:
+                    for generation, F in blocks:
+                        history.record(generation, F)
+            if termination is not None:
+                _, F_front = merge_fronts(np.vstack([r[0] for r in results]), np.vstack([r[1] for r in results]),
+                                          np.concatenate([r[2] for r in results]))
+                if termination.observe(n_done, F_front) >= 1.0:
+                    break
+
+            # Ring migration: island i's elites replace island (i + 1)'s worst.
+            ranks = [_rank(F, CV) for _, F, CV, *_ in results]
+            populations = []
+            for i, (X, *_) in enumerate(results):
+                src_X, src_rank = results[i - 1][0], ranks[i - 1]
+                migrants = src_X[np.argsort(src_rank, kind="stable")[:n_migrants]]
+                survivors = X[np.argsort(ranks[i], kind="stable")[:len(X) - n_migrants]]
+                populations.append(_fill(np.vstack([survivors, migrants]), pop_size, k, rng))
+
+    X = np.vstack([r[0] for r in results])
+    F = np.vstack([r[1] for r in results])
+    CV = np.concatenate([r[2] for r in results])
+    X, F = merge_fronts(X, F, CV)
+    return IslandResult(X, F, n_islands, n_done, n_evals, time.perf_counter() - start, n_infeasible, termination)
@@ -0,0 +1,122 @@
+import numpy as np
+from pymoo.core.crossover import Crossover
+from pymoo.core.mutation import Mutation
+from pymoo.core.repair import Repair
+from pymoo.core.sampling import Sampling
+
+# Operators for binary selection vectors that always hold exactly k ones.
+# Every helper works on a 2-D (rows, n_var) array, so callers with extra
+# structure (e.g. one block per night) can reshape into rows and reuse them.
+
+
+def top_k_mask(keys, k):
+    """Boolean mask selecting the k largest keys in every row."""
+    keys = np.asarray(keys)
+    n_var = keys.shape[1]
+    if not 0 <= k <= n_var:
+        raise ValueError(f"Cannot select {k} of {n_var} variables.")
+    mask = np.zeros(keys.shape, dtype=bool)
+    if k == 0:
+        return mask
+    idx = np.argpartition(-keys, k - 1, axis=1)[:, :k]
+    np.put_along_axis(mask, idx, True, axis=1)
+    return mask
+
+
+def random_k_hot(n_rows, n_var, k, random_state):
+    """`n_rows` uniformly random binary vectors with exactly k ones."""
+    return top_k_mask(random_state.random((n_rows, n_var)), k)
+
+
+def repair_to_k(X, k, random_state, priority=None):
+    """Drop or add ones until every row of `X` holds exactly k of them.
+
+    Ones already present are kept where possible. Rows with too many ones
+    drop their lowest-priority ones; rows with too few gain the
+    highest-priority zeros. Without `priority` the choice is random.
+    """
+    X = np.asarray(X) > 0.5
+    tie_break = random_state.random(X.shape)
+    if priority is not None:
+        # Rescale the priority into [0, 1) so it never outweighs membership.
+        p = np.asarray(priority, dtype=np.float64)
+        span = p.max() - p.min()
+        p = (p - p.min()) / span if span > 0 else np.zeros_like(p)
+        tie_break = 0.999 * p + 0.001 * tie_break
+    return top_k_mask(X + tie_break, k)
+
+
+def swap_mutation(X, n_swaps, random_state):
+    """Swap `n_swaps` random ones with random zeros in every row of `X`."""
+    Xp = np.array(X, dtype=bool)
+    rows = np.arange(len(Xp))
+    for _ in range(n_swaps):
+        ones = np.where(Xp, random_state.random(Xp.shape), -1.0).argmax(axis=1)
+        zeros = np.where(~Xp, random_state.random(Xp.shape), -1.0).argmax(axis=1)
+        # Rows that are all ones or all zeros have nothing to swap.
+        ok = Xp[rows, ones] & ~Xp[rows, zeros]
+        Xp[rows[ok], ones[ok]] = False
+        Xp[rows[ok], zeros[ok]] = True
+    return Xp
+
+
+class FixedCardinalitySampling(Sampling):
+    def __init__(self, k):
+        super().__init__()
+        self.k = k
+
+    def _do(self, problem, n_samples, *args, random_state=None, **kwargs):
+        return random_k_hot(n_samples, problem.n_var, self.k, random_state)
+
+
+class FixedCardinalityCrossover(Crossover):
+    """Keep the ones shared by both parents, fill the rest from either parent."""
+
+    def __init__(self, k, prob=0.9, **kwargs):
+        super().__init__(2, 2, prob=prob, **kwargs)
+        self.k = k
+
+    def _do(self, problem, X, *args, random_state=None, **kwargs):
+        a, b = X[0].astype(bool), X[1].astype(bool)
+        shared = a & b
+        either = a ^ b
+        offspring = []
+        for _ in range(self.n_offsprings):
+            # shared -> 2, in one parent -> (0, 1), in neither -> -1. The union
+            # of two k-hot parents always has at least k ones.
+            keys = np.where(shared, 2.0, np.where(either, random_state.random(a.shape), -1.0))
+            offspring.append(top_k_mask(keys, self.k))
+        return np.stack(offspring)
+
+
+class FixedCardinalityMutation(Mutation):
+    """Swap selected and unselected trainsets, preserving the count."""
+
+    def __init__(self, n_swaps=1, prob=1.0, **kwargs):
+        super().__init__(prob=prob, **kwargs)
+        self.n_swaps = n_swaps
+
+    def _do(self, problem, X, *args, random_state=None, **kwargs):
+        return swap_mutation(X, self.n_swaps, random_state)
+
+
+class FixedCardinalityRepair(Repair):
+    def __init__(self, k, priority=None):
+        super().__init__()
+        self.k = k
+        self.priority = priority
+
+    def _do(self, problem, X, random_state=None, **kwargs):
+        if random_state is None:
+            random_state = np.random.default_rng()
+        return repair_to_k(X, self.k, random_state, self.priority)
+
+
+def fixed_cardinality_operators(k, n_swaps=1):
+    """Keyword arguments that make a pymoo GA search only k-hot vectors."""
+    return dict(
+        sampling=FixedCardinalitySampling(k),
+        crossover=FixedCardinalityCrossover(k),
+        mutation=FixedCardinalityMutation(n_swaps=n_swaps),
+        repair=FixedCardinalityRepair(k),
+    )
@@ -0,0 +1,594 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+# `plan(config)` is the programmatic entry point used by the engine scripts, a
+# service or a scheduler. This module only imports the standard library at
+# import time; pandas, numpy and pymoo are loaded on the first `plan()` call.
+
+MODES = ("nsga2", "islands", "exact", "compare", "horizon")
+MODELS = ("v2", "v3", "assignment")
+
+
+@dataclass
+class PlanConfig:
+    """Everything one planning run needs; the defaults reproduce the v3 script.
+
+    `mode` is one of "nsga2", "islands", "exact" (epsilon-constraint MILP
+    front), "compare" (NSGA2 and exact, with the gap between them) or
+    "horizon" (the next `n_nights` nights planned together by NSGA2, v3 only;
+    see `induction_engine.horizon`). `model`
+    picks the 3-objective v3 problem, the 2-objective v2 one (NSGA2 and
+    islands only) or the Revenue / Standby / IBL "assignment" model (NSGA2
+    only; `min_standby` and `ibl_capacity` are its quotas). `stabling` assigns
+    every plan's trainsets to depot bays and, for v3 in NSGA2 or islands
+    mode, adds the shunting cost as a fourth objective. `cleaning` books each
+    plan's trainsets that need cleaning into the free slots of the night
+    after `today` (at most `max_crew` cleaners at once when set) and, for v2
+    and v3 in NSGA2 or islands mode, rejects plans with more cleaning jobs
+    than those slots can take. `data_dir`, `cache_dir` and `today` are passed
+    to `load_features` when set; without them the directories come from
+    KMRL_DATA_DIR / KMRL_CACHE_DIR (and the timetable from KMRL_GTFS_DIR) or
+    the source checkout (see `induction_engine.features`). Without `n_select`, the number of trainsets
+    to induct follows the GTFS timetable in `gtfs_dir` for the day after
+    `today` (see `induction_engine.demand`), falling back to N_TO_SELECT
+    when no service is scheduled. `branding_exposure` makes v3's branding
+    objective the contract hours covered by the blocks of that timetable
+    (see `induction_engine.branding`; NSGA2 and islands only). `robust`
+    scores v3 plans on `n_scenarios` sampled failure scenarios: expected
+    shortfall replaces punctuality and the `cvar_alpha` CVaR is a fourth
+    objective (see `induction_engine.robust`; NSGA2 and islands only, not
+    with stabling). A `warm_start_path` seeds NSGA2 (every island in
+    islands mode) from the front stored there and stores the new front back.
+    Islands mode checks the hypervolume termination and `max_time` on the
+    merged front between migration epochs. The exact enumeration stops
+    after `exact_max_points` points or `exact_time_limit` seconds.
+    `record_history` keeps the objectives of every `history_every`-th
+    generation in a `HistoryRecorder` (only the non-dominated ones with
+    `history_non_dominated`, memory-mapped at `history_path` when set);
+    islands record one block per island and generation.
+    """
+
+    mode: str = "nsga2"
+    model: str = "v3"
+    n_select: Optional[int] = None
+    gtfs_dir: Optional[str] = None
+    branding_exposure: bool = False
+    robust: bool = False
+    n_scenarios: int = 256
+    cvar_alpha: float = 0.9
+    data_dir: Optional[str] = None
+    cache_dir: Optional[str] = None
+    today: Optional[str] = None
+    pop_size: int = 200
+    n_max_gen: int = 400
+    max_time: Optional[float] = 120
+    n_nights: int = 7
+    hv_window: int = 20
+    hv_tol: float = 1e-4
+    seed: int = 1
+    n_islands: Optional[int] = None
+    migration_interval: int = 20
+    exact_max_points: int = 1000
+    min_standby: int = 0
+    ibl_capacity: Optional[int] = None
+    stabling: bool = False
+    cleaning: bool = False
+    max_crew: Optional[int] = None
+    exact_time_limit: float = 60.0
+    warm_start_path: Optional[str] = None
+    record_history: bool = True
+    history_every: int = 1
+    history_non_dominated: bool = False
+    history_path: Optional[str] = None
+    verbose: bool = False
+
+
+@dataclass
+class PlanResult:
+    """Front of one planning run, with masks over the full fleet in `features`.
+
+    `X` marks the trainsets in revenue service. The assignment model also sets
+    `labels`, one class code per trainset (see `induction_engine.assignment`).
+    With `config.stabling`, `stabling` holds each plan's bay assignment and
+    with `config.cleaning`, `cleaning` holds each plan's `CleaningSchedule`.
+    Single-night v2/v3 results keep their `problem` and `presolve` for
+    `resolve()`.
+    `demand` is the timetable's `ServiceDemand` when it set `n_select`.
+    In horizon mode `X` is the first night of each plan and `horizon` the
+    whole (n_plans, n_nights, n_trainsets) selection tensor.
+    """
+
+    config: PlanConfig
+    features: object
+    n_select: int
+    X: object
+    F: object
+    n_fixed: int
+    n_gen: Optional[int] = None
+    n_evals: Optional[int] = None
+    n_infeasible: Optional[int] = None
+    n_milp_solves: Optional[int] = None
+    elapsed: float = 0.0
+    termination: Optional[str] = None
+    history: object = None
+    labels: object = None
+    stabling: object = None
+    cleaning: object = None
+    horizon: object = None
+    demand: object = None
+    problem: object = None
+    presolve: object = None
+    gap: Optional[dict] = None
+    notes: list = field(default_factory=list)
+
+    def __len__(self):
+        return 0 if self.X is None else len(self.X)
+
+    @property
+    def objective_names(self):
+        from .solutions import OBJECTIVE_NAMES
+
+        if self.config.model == "assignment":
+            return OBJECTIVE_NAMES
+        if self.config.mode == "horizon":
+            from .horizon import HORIZON_OBJECTIVE_NAMES
+
+            return HORIZON_OBJECTIVE_NAMES
+        if self.config.robust:
+            from .robust import ROBUST_OBJECTIVE_NAMES
+
+            return ROBUST_OBJECTIVE_NAMES
+        names = OBJECTIVE_NAMES[:2] if self.config.model == "v2" else OBJECTIVE_NAMES[:3]
+        return names + ("shunting",) if self.F is not None and self.F.shape[1] > len(names) else names
+
+    @property
+    def trainset_ids(self):
+        return self.features["trainsetId"].to_numpy()
+
+    def selected_ids(self, i):
+        """Trainset ids selected by solution `i`."""
+        return self.trainset_ids[self.X[i]].tolist()
+
+    def solutions(self):
+        """The front as a `SolutionTable` (bitsets, index arrays, objectives)."""
+        from .solutions import SolutionTable
+
+        return SolutionTable.from_front(self.X, self.F, self.trainset_ids, self.labels, self.objective_names)
+
+    def recommend(self, weights=None, reference=None, n=5):
+        """Ranked `Shortlist` of the front; see `decision.shortlist`."""
+        from .decision import shortlist
+
+        return shortlist(self.F, self.objective_names, weights, reference, n)
+
+    def resolve(self, reference_points=None, bounds=None, **kwargs):
+        """Short R-NSGA-II re-solve seeded from this front; see `preference.resolve`."""
+        from .preference import resolve
+
+        return resolve(self, reference_points, bounds, **kwargs)
+
+    def explain(self):
+        """Closed-form `Explanation` of every solution (v2/v3 objectives only)."""
+        from .explain import explain_front
+
+        if (self.config.model == "assignment" or self.config.mode == "horizon" or self.config.branding_exposure
+                or self.config.robust or "shunting" in self.objective_names):
+            raise ValueError("Closed-form explanations need the additive v2/v3 objectives.")
+        return explain_front(self.features, self.X, self.n_select, self.objective_names)
+
+    def replanner(self):
+        """A `Replanner` holding this front, for incremental status changes.
+
+        The Replanner re-evaluates the plain single-night v3 objectives, so
+        fronts from other models or with extra objectives or constraints are
+        rejected rather than silently re-scored without them.
+        """
+        from .replan import Replanner
+
+        config = self.config
+        if (config.model != "v3" or config.mode == "horizon" or config.stabling or config.cleaning
+                or config.branding_exposure or config.robust):
+            raise ValueError("Replanning needs a single-night v3 front without stabling, cleaning, "
+                             "branding exposure or robust objectives.")
+        return Replanner(self.features, self.X, self.n_select)
+
+
+def _features(config):
+    from .features import load_features
+
+    kwargs = {name: getattr(config, name) for name in ("data_dir", "cache_dir", "today")
+              if getattr(config, name) is not None}
+    return load_features(**kwargs)
+
+
+def _service_demand(config):
+    """The GTFS `ServiceDemand` of the day after `config.today`, or None."""
+    import os
+
+    import pandas as pd
+
+    from .demand import GTFS_DIR, service_demand
+
+    gtfs_dir = GTFS_DIR if config.gtfs_dir is None else config.gtfs_dir
+    if gtfs_dir is None or not os.path.exists(os.path.join(gtfs_dir, "stop_times.csv")):
+        return None
+    today = pd.Timestamp.now(tz="UTC") if config.today is None else pd.Timestamp(config.today)
+    return service_demand((today + pd.Timedelta(days=1)).strftime("%Y-%m-%d"), gtfs_dir)
+
+
+def _branding_exposure(config, result, reduced):
+    """`BrandingExposure` over the timetable's blocks, or None without service
+    or contracts."""
+    import os
+
+    from .branding import BrandingExposure
+    from .features import DATA_DIR
+
+    data_dir = DATA_DIR if config.data_dir is None else config.data_dir
+    if not os.path.exists(os.path.join(data_dir, "branding_priorities.csv")):
+        # load_features scores every trainset 0 without the contracts file.
+        result.notes.append("Branding exposure: no branding_priorities.csv; using the priority score (0).")
+        return None
+    if result.demand is None:
+        result.demand = _service_demand(config)
+    if result.demand is None:
+        result.notes.append("Branding exposure: no timetable service found; using the priority score.")
+        return None
+    branding = BrandingExposure.from_demand(result.demand, reduced["trainsetId"], data_dir, config.today)
+    result.notes.append(f"Branding exposure: {len(branding.contract_need)} live contracts need "
+                        f"{branding.total_need:.1f} h over {result.demand.n_blocks} blocks.")
+    return branding
+
+
+def _robust_shortfall(config, result, reduced):
+    """`RobustShortfall` against the timetable's blocks, or n_select without one."""
+    from .robust import RobustShortfall, failure_probability
+
+    p_fail = failure_probability(reduced)
+    target = result.n_select if result.demand is None else min(result.demand.n_blocks, result.n_select)
+    robust = RobustShortfall(p_fail, target, config.n_scenarios, config.cvar_alpha, config.seed)
+    result.notes.append(f"Robust: {robust.n_scenarios} failure scenarios against {target} trainsets in service, "
+                        f"failure probability {p_fail.min():.3f}-{p_fail.max():.3f}.")
+    return robust
+
+
+def _history_recorder(config, n_obj, blocks_per_gen=1):
+    """A `HistoryRecorder` sized for the whole run, or None when not recording."""
+    from .history import HistoryRecorder
+
+    if not config.record_history:
+        return None
+    n_recorded = -(-config.n_max_gen // config.history_every)
+    return HistoryRecorder(n_obj=n_obj, max_rows=config.pop_size, capacity=n_recorded * blocks_per_gen,
+                           every=config.history_every, non_dominated_only=config.history_non_dominated,
+                           path=config.history_path)
+
+
+def _minimize(problem, operators, config, result):
+    """One NSGA2 run with hypervolume termination and, if configured, history."""
+    from pymoo.algorithms.moo.nsga2 import NSGA2
+    from pymoo.optimize import minimize
+
+    from .termination import HypervolumeTermination
+
+    algorithm = NSGA2(pop_size=config.pop_size, eliminate_duplicates=True, **operators)
+    result.history = _history_recorder(config, problem.n_obj)
+    termination = HypervolumeTermination(window=config.hv_window, tol=config.hv_tol,
+                                         n_max_gen=config.n_max_gen, max_time=config.max_time)
+    callback = {} if result.history is None else {"callback": result.history}
+    res = minimize(problem, algorithm, termination, seed=config.seed, verbose=config.verbose, **callback)
+
+    # `minimize` works on a copy of the termination; read the stats from it.
+    termination = res.algorithm.termination
+    result.termination = termination.summary()
+    result.n_gen = termination.n_gen
+    result.n_evals = res.algorithm.evaluator.n_eval
+    result.n_infeasible = problem.n_infeasible
+    if config.history_path is not None and result.history is not None:
+        result.history.flush()
+    return res
+
+
+def _load_warm_start(problem, features, config, result, seeds):
+    """The stored front, the inputs' fingerprint and one seeded population per
+    entry of `seeds` (None without a stored front)."""
+    from .warm_start import fingerprint, load_front, warm_start_population
+
+    input_fingerprint = fingerprint(features)
+    stored_front = load_front(config.warm_start_path)
+    if stored_front is None:
+        return None, input_fingerprint, None
+    populations = [warm_start_population(stored_front, problem.df, result.n_select, config.pop_size, seed=seed)
+                   for seed in seeds]
+    unchanged = " (inputs unchanged)" if stored_front["fingerprint"] == input_fingerprint else ""
+    result.notes.append(f"Warm start: seeding from {len(stored_front['X'])} stored solutions{unchanged}.")
+    return stored_front, input_fingerprint, populations
+
+
+def _save_warm_start(X, F, features, config, result, stored_front, input_fingerprint):
+    from .warm_start import save_front
+
+    if stored_front is not None:
+        cold_n_gen = stored_front["cold_n_gen"]
+        result.notes.append(f"Warm start saved {cold_n_gen - result.n_gen} generations against "
+                            f"the last cold run ({cold_n_gen}).")
+    else:
+        cold_n_gen = None
+    save_front(config.warm_start_path, X, F, features["trainsetId"], input_fingerprint, result.n_gen, cold_n_gen)
+
+
+def _run_nsga2(problem, features, pre, config, result):
+    import numpy as np
+
+    from .operators import fixed_cardinality_operators
+
+    # Every candidate holds exactly n_select trains, so no evaluations are
+    # spent on wrong fleet sizes and res.X comes back as boolean masks.
+    operators = fixed_cardinality_operators(result.n_select)
+
+    if config.warm_start_path is not None:
+        stored_front, input_fingerprint, populations = _load_warm_start(problem, features, config, result,
+                                                                        [config.seed])
+        if populations is not None:
+            operators["sampling"] = populations[0]
+
+    res = _minimize(problem, operators, config, result)
+    if res.X is None:
+        return None, None
+
+    X = pre.expand(np.atleast_2d(res.X))
+    if config.warm_start_path is not None:
+        _save_warm_start(X, res.F, features, config, result, stored_front, input_fingerprint)
+    return X, np.atleast_2d(res.F)
+
+
+def _run_islands(problem, features, pre, config, result):
+    import math
+    import os
+
+    from .islands import run_islands
+    from .termination import HypervolumeTermination
+
+    n_islands = config.n_islands or os.cpu_count() or 1
+    initial = None
+    if config.warm_start_path is not None:
+        stored_front, input_fingerprint, initial = _load_warm_start(
+            problem, features, config, result, [config.seed + 1000 * i for i in range(n_islands)])
+    result.history = _history_recorder(config, problem.n_obj, blocks_per_gen=n_islands)
+    # The merged front is only seen between epochs, so the window counts epochs.
+    termination = HypervolumeTermination(window=max(math.ceil(config.hv_window / config.migration_interval), 1),
+                                         tol=config.hv_tol, n_max_gen=config.n_max_gen, max_time=config.max_time)
+    islands = run_islands(problem, result.n_select, n_islands=n_islands, pop_size=config.pop_size,
+                          n_gen=config.n_max_gen, migration_interval=config.migration_interval,
+                          seed=config.seed, history=result.history, termination=termination, initial=initial)
+    if config.history_path is not None and result.history is not None:
+        result.history.flush()
+    result.termination = termination.summary()
+    result.n_gen, result.n_evals, result.n_infeasible = islands.n_gen, islands.n_evals, islands.n_infeasible
+    result.notes.append(f"Islands: {islands.n_islands} x {islands.n_gen} generations, "
+                        f"{islands.n_evals} evaluations in {islands.elapsed:.2f}s -> "
+                        f"{len(islands.F)} merged non-dominated solutions.")
+    if len(islands.F) == 0:
+        return None, None
+    X = pre.expand(islands.X)
+    if config.warm_start_path is not None:
+        _save_warm_start(X, islands.F, features, config, result, stored_front, input_fingerprint)
+    return X, islands.F
+
+
+def _run_horizon(reduced, pre, config, result):
+    import numpy as np
+
+    from .horizon import HorizonProblem, as_tensor, horizon_operators
+
+    kwargs = {} if result.demand is None else {"service_hours": result.demand.hours_per_train}
+    problem = HorizonProblem(reduced, result.n_select, config.n_nights, **kwargs)
+    res = _minimize(problem, horizon_operators(result.n_select, config.n_nights), config, result)
+    if res.X is None:
+        return
+    R = as_tensor(res.X, config.n_nights).astype(bool)
+    result.horizon = pre.expand(R.reshape(-1, R.shape[2])).reshape(len(R), config.n_nights, -1)
+    result.X, result.F = result.horizon[:, 0], np.atleast_2d(res.F)
+    result.notes.append(f"Horizon: {config.n_nights} nights planned together; only the first is committed.")
+
+
+def _run_assignment(features, config, result):
+    import numpy as np
+
+    from .assignment import REVENUE, InductionAssignmentProblem, assignment_operators
+
+    # Unfit trainsets stay in the chromosome: they cannot run but may take an
+    # IBL place, so the whole fleet is planned without pre-solve reduction.
+    ibl_capacity = len(features) if config.ibl_capacity is None else config.ibl_capacity
+    problem = InductionAssignmentProblem(features, result.n_select, config.min_standby, ibl_capacity)
+    res = _minimize(problem, assignment_operators(result.n_select, ibl_capacity), config, result)
+    if res.X is None:
+        return
+    result.labels = np.rint(np.atleast_2d(res.X)).astype(np.int8)
+    result.X, result.F = result.labels == REVENUE, np.atleast_2d(res.F)
+
+
+def _stabling_stage(depot, features, pre, result):
+    import numpy as np
+
+    from .assignment import IBL, REVENUE, STANDBY
+    from .stabling import assign_bays
+
+    if result.X is None:
+        return
+    classes = result.labels
+    if classes is None:
+        # Selected trainsets run, other fit ones stand by, unfit ones go to the IBL.
+        classes = np.where(result.X, REVENUE, np.where(pre.eligible, STANDBY, IBL))
+    result.stabling = assign_bays(depot, result.trainset_ids, classes)
+    result.notes.append(f"Stabling: {int(result.stabling.n_moves.min())}-{int(result.stabling.n_moves.max())} "
+                        f"shunting moves across {len(classes)} plans.")
+
+
+def _cleaning_inputs(config, features):
+    """The night's slot index and each trainset's cleaning job."""
+    import pandas as pd
+
+    from .cleaning import SlotIndex, cleaning_demand, load_slots, night_window
+    from .features import DATA_DIR
+
+    data_dir = DATA_DIR if config.data_dir is None else config.data_dir
+    today = pd.Timestamp.now(tz="UTC") if config.today is None else config.today
+    index = SlotIndex(load_slots(data_dir), night_window(today))
+    return index, cleaning_demand(features["trainsetId"], data_dir)
+
+
+def _cleaning_stage(index, jobs, result):
+    from .cleaning import schedule_cleaning
+
+    if result.X is None:
+        result.notes.append(f"Cleaning: no plan fits the {int(index.free.sum())} free cleaning slots; "
+                            f"the front is empty.")
+        return
+    ids = result.trainset_ids
+    result.cleaning = [schedule_cleaning(index, ids[x], jobs[x], result.config.max_crew) for x in result.X]
+    unmet = [schedule.n_unmet for schedule in result.cleaning]
+    result.notes.append(f"Cleaning: {int(index.free.sum())} free slots, {min(unmet)}-{max(unmet)} "
+                        f"unmet cleaning jobs across {len(unmet)} plans.")
+
+
+def plan(config=None):
+    """Load the features, pre-solve and optimize one night; returns a `PlanResult`.
+
+    Raises FileNotFoundError when a source CSV is missing and
+    InfeasibleNightError when too few trainsets are eligible or, with
+    `cleaning`, too few fit the night's cleaning slots.
+    """
+    config = PlanConfig() if config is None else config
+    if config.mode not in MODES:
+        raise ValueError(f"Unknown mode {config.mode!r}; expected one of {MODES}.")
+    if config.model not in MODELS:
+        raise ValueError(f"Unknown model {config.model!r}; expected one of {MODELS}.")
+    if config.model == "v2" and config.mode in ("exact", "compare"):
+        raise ValueError("The exact front is only available for the v3 model.")
+    if config.model == "assignment" and config.mode != "nsga2":
+        raise ValueError("The assignment model only runs in nsga2 mode.")
+    if config.mode == "horizon" and (config.model != "v3" or config.stabling or config.cleaning
+                                     or config.warm_start_path is not None):
+        raise ValueError("Horizon mode plans the v3 model without stabling, cleaning or warm start.")
+    if config.stabling and config.model == "v3" and config.mode in ("exact", "compare"):
+        raise ValueError("The shunting objective is not available to the exact front.")
+    if config.cleaning and config.mode in ("exact", "compare"):
+        raise ValueError("The cleaning constraint is not available to the exact front.")
+    if config.branding_exposure and (config.model != "v3" or config.mode not in ("nsga2", "islands")):
+        raise ValueError("Branding exposure is a v3 objective for the nsga2 and islands modes.")
+    if config.robust and (config.model != "v3" or config.mode not in ("nsga2", "islands") or config.stabling):
+        raise ValueError("Robust objectives are for v3 in nsga2 or islands mode, without stabling.")
+
+    from .presolve import presolve
+    from .problem import N_TO_SELECT, TrainSchedulingProblemV2, TrainSchedulingProblemV3
+
+    start = time.perf_counter()
+    demand = None if config.n_select is not None else _service_demand(config)
+    if config.n_select is not None:
+        n_select = config.n_select
+    else:
+        n_select = N_TO_SELECT if demand is None else demand.n_required
+    features = _features(config)
+
+    slot_index = jobs = capacity = None
+    if config.cleaning:
+        from .cleaning import cleaning_capacity
+
+        slot_index, jobs = _cleaning_inputs(config, features)
+        if config.model != "assignment":
+            capacity = cleaning_capacity(slot_index, jobs)
+
+    # Pre-solve: trainsets with an open job card or an invalid Rolling-Stock
+    # certificate can never be selected, so fix them to 0 and drop them from
+    # the chromosome. An unsatisfiable night (including one whose cleaning
+    # jobs cannot fit the free slots) raises here, before any generation,
+    # with a diagnosis of the conflicting constraints.
+    pre = presolve(features, n_select, config.min_standby if config.model == "assignment" else 0, capacity)
+    result = PlanResult(config, features, n_select, None, None, pre.n_fixed, demand=demand)
+    if demand is not None:
+        result.notes.append(f"Timetable {demand.date} ({'/'.join(demand.service_ids)}): {demand.n_trips} trips in "
+                            f"{demand.n_blocks} blocks + {demand.n_spare} spares -> inducting {n_select}.")
+    elif config.n_select is None:
+        result.notes.append(f"No timetable service found; inducting the default {n_select}.")
+
+    depot = None
+    if config.stabling:
+        from .features import DATA_DIR
+        from .stabling import load_depot
+
+        depot = load_depot(DATA_DIR if config.data_dir is None else config.data_dir)
+
+    if config.model == "assignment":
+        _run_assignment(features, config, result)
+        if depot is not None:
+            _stabling_stage(depot, features, pre, result)
+        if slot_index is not None:
+            _cleaning_stage(slot_index, jobs, result)
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    reduced = pre.reduce(features)
+    cleaning = None
+    if capacity is not None:
+        D, dedicated, full = capacity
+        cleaning = (D[pre.index], dedicated, full)
+    if config.mode == "horizon":
+        # `_run_horizon` builds its own multi-night problem; no single-night
+        # problem is kept, so the result cannot be re-solved as one night.
+        problem = None
+    elif config.model == "v3":
+        branding = None
+        if config.branding_exposure:
+            branding = _branding_exposure(config, result, reduced)
+        shunting_cost = None
+        if depot is not None:
+            from .assignment import REVENUE, STANDBY
+            from .stabling import class_costs
+
+            shunting_cost = class_costs(depot, reduced["trainsetId"].to_numpy())[:, [REVENUE, STANDBY]]
+        robust = _robust_shortfall(config, result, reduced) if config.robust else None
+        problem = TrainSchedulingProblemV3(reduced, n_select, shunting_cost, cleaning, branding, robust)
+    else:
+        problem = TrainSchedulingProblemV2(reduced, n_select, cleaning)
+    result.problem, result.presolve = problem, pre
+    result.notes.append(f"Pre-solve: fixed {pre.n_fixed} ineligible trainsets to 0, "
+                        f"optimizing over {pre.n_eligible}.")
+
+    if config.mode == "horizon":
+        _run_horizon(reduced, pre, config, result)
+
+    if config.mode in ("nsga2", "compare"):
+        result.X, result.F = _run_nsga2(problem, features, pre, config, result)
+
+    if config.mode == "islands":
+        result.X, result.F = _run_islands(problem, features, pre, config, result)
+
+    if config.mode in ("exact", "compare"):
+        from .exact import front_gap, solve_exact
+
+        exact = solve_exact(problem, max_points=config.exact_max_points, time_limit=config.exact_time_limit)
+        result.n_milp_solves = exact.n_solves
+        status = "complete" if exact.complete else "stopped early"
+        result.notes.append(f"Exact front: {len(exact.F)} non-dominated points from {exact.n_solves} "
+                            f"MILPs in {exact.elapsed:.2f}s ({status}).")
+        if len(exact.F) == 0:
+            # Nothing proven before the limit: keep NSGA2's front in compare mode.
+            result.notes.append("Exact front: no point proven; nothing to compare against."
+                                if config.mode == "compare" else "Exact front: no point proven; the front is empty.")
+        else:
+            if config.mode == "compare" and result.F is not None:
+                result.gap = front_gap(result.F, exact.F)
+                result.notes.append(f"NSGA2 vs exact: recovered {result.gap['recovered']}/{result.gap['n_exact']} "
+                                    f"points, GD={result.gap['gd']:.4f}, IGD={result.gap['igd']:.4f}")
+            result.X, result.F = pre.expand(exact.X), exact.F
+
+    if depot is not None:
+        _stabling_stage(depot, features, pre, result)
+    if slot_index is not None:
+        _cleaning_stage(slot_index, jobs, result)
+    result.elapsed = time.perf_counter() - start
+    return result
@@ -0,0 +1,113 @@
+import os
+
+import numpy as np
+
+from .solutions import report_objectives
+
+# Headless plotting: figures are drawn on a bare matplotlib `Figure` (no pyplot,
+# no GUI backend) and written to PNG/SVG, so it runs on a planning server. The
+# history cloud is aggregated into a 2-D histogram block by block instead of
+# one marker per point, so drawing cost does not grow with the run. Axes and
+# labels follow the result's objective names, in report units.
+# matplotlib is only imported when a plot is drawn and ships with the `plot`
+# extra (`pip install ./Optimization_Engine[plot]`).
+
+
+AXIS_LABELS = {
+    "mileage": "Total Mileage (Cost Proxy)",
+    "punctuality": "Punctuality Score (%)",
+    "branding": "Branding Score (Higher is Better)",
+    "standby_depth": "Standby Depth (Higher is Better)",
+    "shunting": "Shunting Moves",
+    "mileage_variance": "End-of-Horizon Mileage Variance",
+    "branding_shortfall": "Branding Shortfall (Lower is Better)",
+    "expected_shortfall": "Expected Shortfall (Trainsets)",
+    "cvar_shortfall": "CVaR Shortfall (Trainsets)",
+}
+
+
+def _label(name):
+    return AXIS_LABELS.get(name, name)
+
+
+def _report_edges(edges, j, names):
+    """Histogram edges of objective `j` in report units (the conversion is affine)."""
+    F = np.full((len(edges), len(names)), np.nan)
+    F[:, j] = edges
+    return report_objectives(F, names)[:, j]
+
+
+def _figure(figsize):
+    try:
+        from matplotlib.colors import LogNorm
+        from matplotlib.figure import Figure
+    except ImportError as e:
+        raise ImportError("Plotting needs matplotlib; install the engine with the `plot` extra.") from e
+    return Figure(figsize=figsize), LogNorm
+
+
+def history_density(history, bins=200, x=0, y=1):
+    """Histogram of objectives `x` and `y` over every recorded block.
+
+    The bin range comes from the recorder's running bounds, so the history is
+    streamed once and never concatenated. Returns (counts, x_edges, y_edges),
+    or None when nothing was recorded.
+    """
+    lower, upper = history.lower[[x, y]], history.upper[[x, y]]
+    if not np.all(np.isfinite(lower)):
+        return None
+    # A constant objective still needs a non-empty bin range.
+    upper = np.where(upper > lower, upper, lower + 1.0)
+    x_edges = np.linspace(lower[0], upper[0], bins + 1)
+    y_edges = np.linspace(lower[1], upper[1], bins + 1)
+    counts = np.zeros((bins, bins), dtype=np.int64)
+    for _, F in history.iter_blocks():
+        block, _, _ = np.histogram2d(F[:, x], F[:, y], bins=(x_edges, y_edges))
+        counts += block.astype(np.int64)
+    return counts, x_edges, y_edges
+
+
+def plot_front(result, path, formats=("png", "svg"), bins=200, dpi=150,
+               title="Optimal Fleet Schedule vs. All Considered Options"):
+    """Write a `PlanResult`'s history density and front (first vs. second objective).
+
+    `path` is the output path without extension; one file is written per
+    entry of `formats` and the written paths are returned. Axes and labels
+    follow `result.objective_names` in report units; the front is coloured
+    by the third objective when there is one.
+    """
+    if result.F is None or len(result.F) == 0:
+        raise ValueError("There is no front to plot.")
+    names = result.objective_names
+    fig, LogNorm = _figure((10, 6))
+    ax = fig.add_subplot()
+
+    # History: one cell per bin, shaded by how many considered options fell in it
+    density = None if result.history is None else history_density(result.history, bins)
+    if density is not None:
+        counts, x_edges, y_edges = density
+        x_edges, y_edges = _report_edges(x_edges, 0, names), _report_edges(y_edges, 1, names)
+        mesh = ax.pcolormesh(x_edges, y_edges, np.ma.masked_equal(counts.T, 0), cmap="Greys",
+                             norm=LogNorm(vmin=1), rasterized=True)
+        fig.colorbar(mesh, ax=ax, label="Considered Options (count)")
+
+    # Final Pareto solutions on top
+    plot_f = report_objectives(result.F, names)
+    if plot_f.shape[1] > 2:
+        scatter = ax.scatter(plot_f[:, 0], plot_f[:, 1], c=plot_f[:, 2], cmap="viridis", s=150,
+                             edgecolors="black", linewidths=0.5, label="Optimal Solutions")
+        fig.colorbar(scatter, ax=ax, label=_label(names[2]))
+    else:
+        ax.scatter(plot_f[:, 0], plot_f[:, 1], color="green", s=100, label="Optimal Solutions")
+
+    ax.set_xlabel(_label(names[0]))
+    ax.set_ylabel(_label(names[1]))
+    ax.legend()
+    ax.set_title(title)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    written = []
+    for fmt in formats:
+        written.append(f"{path}.{fmt}")
+        fig.savefig(written[-1], dpi=dpi, bbox_inches="tight")
+    return written
@@ -0,0 +1,116 @@
+import dataclasses
+import time
+
+import numpy as np
+from pymoo.core.problem import Problem
+
+from .operators import fixed_cardinality_operators
+from .solutions import report_objectives
+from .warm_start import warm_start_population
+
+# Preference re-solve: a short R-NSGA-II run around operator reference points,
+# seeded from an existing front, with optional bounds on the objectives
+# ("keep branding above X"). Reference points and bounds are given in report
+# units (punctuality in %, branding as a positive score) and converted to the
+# minimised objective space once.
+
+RESOLVE_POP_SIZE = 100
+RESOLVE_N_GEN = 100
+RESOLVE_MAX_TIME = 2.0  # seconds; short enough for the evening planning meeting
+RESOLVE_EPSILON = 0.01
+
+
+class ObjectiveBounds(Problem):
+    """`problem` with one extra constraint F_j <= upper_j per bounded objective."""
+
+    def __init__(self, problem, upper):
+        self.problem = problem
+        self.upper = np.asarray(upper, dtype=np.float64)
+        self.bounded = np.flatnonzero(np.isfinite(self.upper))
+        super().__init__(n_var=problem.n_var, n_obj=problem.n_obj,
+                         n_constr=problem.n_ieq_constr + len(self.bounded), xl=0, xu=1, vtype=bool)
+        self.n_evaluated = 0
+        self.n_infeasible = 0
+
+    def _evaluate(self, x, out, *args, **kwargs):
+        F, G = self.problem.evaluate(x, return_values_of=["F", "G"])
+        G = np.column_stack([G, F[:, self.bounded] - self.upper[self.bounded]])
+        self.n_evaluated += len(F)
+        self.n_infeasible += int(np.count_nonzero((G > 0).any(axis=1)))
+        out["F"] = F
+        out["G"] = G
+
+
+def to_objective_space(values, objective_names):
+    """Report-unit rows (NaN allowed) as minimised objective values."""
+    values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+    # Report units are an involution of F: converting twice is the identity.
+    return report_objectives(values, objective_names)
+
+
+def resolve(result, reference_points=None, bounds=None, pop_size=RESOLVE_POP_SIZE, n_gen=RESOLVE_N_GEN,
+            max_time=RESOLVE_MAX_TIME, epsilon=RESOLVE_EPSILON, seed=1):
+    """Re-solve `result`'s problem near the operator's preferences.
+
+    `reference_points` is one point or a list of points in report units;
+    `bounds` maps objective names to the worst acceptable value in report
+    units (an upper bound on mileage, a lower bound on punctuality or
+    branding). Without reference points the front's ideal point, tightened
+    to the bounds, is used. Half the initial population comes from the
+    current front. Returns a new `PlanResult`.
+    """
+    from pymoo.algorithms.moo.rnsga2 import RNSGA2
+    from pymoo.optimize import minimize
+
+    from .termination import HypervolumeTermination
+
+    if result.config.mode == "horizon":
+        raise ValueError("Horizon plans cover several nights and cannot be re-solved as one night.")
+    if result.problem is None or result.X is None:
+        raise ValueError("Only v2/v3 plans with a front can be re-solved.")
+    start = time.perf_counter()
+    names = result.objective_names
+    n_obj = result.F.shape[1]
+
+    upper = np.full(n_obj, np.inf)
+    described = []
+    for name, value in (bounds or {}).items():
+        if name not in names:
+            raise ValueError(f"Unknown objective {name!r}; expected one of {names}.")
+        j = names.index(name)
+        row = np.full((2, n_obj), np.nan)
+        row[:, j] = value, value + 1
+        converted = to_objective_space(row, names)[:, j]
+        upper[j] = converted[0]
+        # A report value that grows with F is a cap, otherwise a floor.
+        described.append(f"{name} {'<=' if converted[1] > converted[0] else '>='} {value}")
+    if reference_points is None:
+        ref_points = np.minimum(result.F.min(axis=0), upper)[None, :]
+    else:
+        ref_points = to_objective_space(reference_points, names)
+
+    problem = ObjectiveBounds(result.problem, upper) if np.isfinite(upper).any() else result.problem
+    n_infeasible = problem.n_infeasible
+    pre = result.presolve
+    operators = fixed_cardinality_operators(result.n_select)
+    stored = {"X": result.X, "trainset_ids": result.trainset_ids}
+    operators["sampling"] = warm_start_population(stored, result.problem.df, result.n_select, pop_size, seed=seed)
+    algorithm = RNSGA2(ref_points=ref_points, epsilon=epsilon, pop_size=pop_size, eliminate_duplicates=True,
+                       **operators)
+    termination = HypervolumeTermination(window=result.config.hv_window, tol=result.config.hv_tol,
+                                         n_max_gen=n_gen, max_time=max_time)
+    res = minimize(problem, algorithm, termination, seed=seed, verbose=False)
+
+    termination = res.algorithm.termination
+    resolved = dataclasses.replace(
+        result, X=None, F=None, n_gen=termination.n_gen, n_evals=res.algorithm.evaluator.n_eval,
+        n_infeasible=problem.n_infeasible - n_infeasible, n_milp_solves=None,
+        termination=termination.summary(), history=None, labels=None, stabling=None, cleaning=None,
+        horizon=None, gap=None, notes=[])
+    if res.X is not None:
+        resolved.X, resolved.F = pre.expand(np.atleast_2d(res.X)), np.atleast_2d(res.F)
+    resolved.elapsed = time.perf_counter() - start
+    resolved.notes.append(f"Preference re-solve: {len(ref_points)} reference point(s)"
+                          + (f", bounds {', '.join(described)}" if described else "")
+                          + f", {len(resolved)} solutions in {resolved.elapsed:.2f}s.")
+    return resolved
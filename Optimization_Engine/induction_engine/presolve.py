@@ -0,0 +1,78 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from .errors import InfeasibleNightError  # noqa: F401 (re-exported)
+from .problem import N_TO_SELECT
+
+
+def eligibility_mask(df):
+    """Trainsets with no open job card and a valid Rolling-Stock certificate."""
+    job_card_open = df["job_card_open"].to_numpy(dtype=bool)
+    cert_valid = df["fitness_certificate_valid"].to_numpy(dtype=bool)
+    return ~job_card_open & cert_valid
+
+
+@dataclass
+class PresolveResult:
+    eligible: np.ndarray
+    n_select: int
+
+    @property
+    def index(self):
+        """Fleet positions of the trainsets kept as decision variables."""
+        return np.flatnonzero(self.eligible)
+
+    @property
+    def n_fleet(self):
+        return len(self.eligible)
+
+    @property
+    def n_eligible(self):
+        return int(self.eligible.sum())
+
+    @property
+    def n_fixed(self):
+        return self.n_fleet - self.n_eligible
+
+    def reduce(self, df):
+        """The rows of `df` that remain in the search space."""
+        return df.iloc[self.index].reset_index(drop=True)
+
+    def expand(self, X):
+        """Map reduced selection masks back to full-fleet masks."""
+        X = np.atleast_2d(np.asarray(X, dtype=bool))
+        full = np.zeros((len(X), self.n_fleet), dtype=bool)
+        full[:, self.index] = X
+        return full
+
+    def restrict(self, X_full):
+        """Map full-fleet masks onto the reduced search space."""
+        return np.atleast_2d(np.asarray(X_full, dtype=bool))[:, self.index]
+
+
+def presolve(df, n_select=N_TO_SELECT, min_standby=0, cleaning=None):
+    """Fix hard-infeasible trainsets to 0 and drop them from the search space.
+
+    Raises InfeasibleNightError straight away when fewer than `n_select`
+    trainsets are left, too few remain for `min_standby` on standby, or,
+    with `cleaning` (the `cleaning.cleaning_capacity` triple over `df`), the
+    eligible trainsets' cleaning jobs cannot fit the night's slots, instead
+    of letting the GA discover it. The error carries a `Diagnosis`.
+    """
+    eligible = eligibility_mask(df)
+    result = PresolveResult(eligible=eligible, n_select=n_select)
+    n_cleanable = None
+    if cleaning is not None:
+        from .cleaning import cleanable_count
+
+        D, dedicated, full = cleaning
+        n_cleanable = cleanable_count(D[eligible], dedicated, full)
+    if (result.n_eligible < n_select or result.n_fleet - n_select < min_standby
+            or (n_cleanable is not None and n_cleanable < n_select)):
+        from .diagnose import diagnose
+
+        excluded = df["trainsetId"].to_numpy()[~eligible]
+        raise InfeasibleNightError(result.n_eligible, n_select, excluded,
+                                   diagnose(df, n_select, min_standby, cleaning), n_cleanable)
+    return result
@@ -0,0 +1,121 @@
+import numpy as np
+from pymoo.core.problem import Problem
+
+N_TO_SELECT = 15
+
+# Column layout of the per-trainset weight matrix. A population's objectives
+# and constraints all come out of one `x @ W` product; the last column is all
+# ones so the same product also yields the cardinality vector.
+W_MILEAGE = 0
+W_PUNCTUALITY = 1
+W_BRANDING = 2
+W_JOB_CARD_OPEN = 3
+W_CERT_INVALID = 4
+W_COUNT = 5
+N_WEIGHT_COLUMNS = 6
+W_SHUNTING = N_WEIGHT_COLUMNS  # appended when the shunting objective is enabled
+
+
+def build_weight_matrix(df):
+    """Build the contiguous (n_trainsets, 6) float64 weight matrix for `df`."""
+    W = np.empty((len(df), N_WEIGHT_COLUMNS), dtype=np.float64)
+    W[:, W_MILEAGE] = df["mileage"].to_numpy(dtype=np.float64)
+    W[:, W_PUNCTUALITY] = df["punctuality_score"].to_numpy(dtype=np.float64)
+    W[:, W_BRANDING] = df["branding_priority_score"].to_numpy(dtype=np.float64)
+    W[:, W_JOB_CARD_OPEN] = df["job_card_open"].to_numpy(dtype=bool)
+    W[:, W_CERT_INVALID] = ~df["fitness_certificate_valid"].to_numpy(dtype=bool)
+    W[:, W_COUNT] = 1.0
+    return np.ascontiguousarray(W)
+
+
+class TrainSchedulingProblemV3(Problem):
+    """Select n_select trainsets: mileage, punctuality and branding objectives.
+
+    With `shunting_cost`, an (n, 2) array of each trainset's stabling cost in
+    revenue service and on standby (see `stabling.class_costs`), a fourth
+    objective adds the fleet's shunting cost: one more weight-matrix column.
+    With `cleaning`, a (demand, dedicated, full) triple from
+    `cleaning.cleaning_capacity`, a fourth constraint bounds the selected
+    trainsets' cleaning jobs by the night's free slots; the demand one-hots
+    are appended to the weight matrix. With `branding`, a
+    `branding.BrandingExposure`, the branding objective is the contract hours
+    covered by the blocks the selection would run instead of the priority sum.
+    With `robust`, a `robust.RobustShortfall`, the expected shortfall under
+    random failures replaces punctuality and its CVaR is a fourth objective.
+    """
+
+    def __init__(self, df, n_select=N_TO_SELECT, shunting_cost=None, cleaning=None, branding=None,
+                 robust=None):
+        if shunting_cost is not None and robust is not None:
+            raise ValueError("The shunting and robust objectives cannot be combined.")
+        n_obj = 3 if shunting_cost is None and robust is None else 4
+        n_constr = 3 if cleaning is None else 4
+        super().__init__(n_var=len(df), n_obj=n_obj, n_constr=n_constr, xl=0, xu=1, vtype=bool)
+        self.df = df
+        self.n_select = n_select
+        self.W = build_weight_matrix(df)
+        self.shunting_base = 0.0
+        if shunting_cost is not None:
+            shunting_cost = np.asarray(shunting_cost, dtype=np.float64)
+            # Every trainset is on standby unless selected: a constant plus the
+            # per-trainset difference for the selected ones.
+            self.shunting_base = float(shunting_cost[:, 1].sum())
+            self.W = np.ascontiguousarray(
+                np.column_stack([self.W, shunting_cost[:, 0] - shunting_cost[:, 1]]))
+        self.branding = branding
+        self.robust = robust
+        self.cleaning = None
+        if cleaning is not None:
+            demand, dedicated, full = cleaning
+            self.cleaning = (slice(self.W.shape[1], self.W.shape[1] + demand.shape[1]),
+                             np.asarray(dedicated, dtype=np.float64), float(full))
+            self.W = np.ascontiguousarray(np.column_stack([self.W, demand]))
+        # Running totals over every evaluated candidate, for benchmarking.
+        self.n_evaluated = 0
+        self.n_infeasible = 0
+
+    def update_rows(self, rows):
+        """Rebuild the weight-matrix rows of trainsets whose features changed."""
+        rows = np.atleast_1d(rows)
+        self.W[rows, :N_WEIGHT_COLUMNS] = build_weight_matrix(self.df.iloc[rows])
+
+    def _evaluate(self, x, out, *args, **kwargs):
+        M = np.asarray(x, dtype=np.float64) @ self.W
+        count = M[:, W_COUNT]
+        safe_divisor = np.where(count > 0, count, 1.0)
+
+        f1 = M[:, W_MILEAGE]
+        f2 = 100 - M[:, W_PUNCTUALITY] / safe_divisor
+        f3 = -M[:, W_BRANDING] if self.branding is None else -self.branding.coverage(x)
+        g1 = (count - self.n_select) ** 2
+        g2 = M[:, W_JOB_CARD_OPEN]
+        g3 = M[:, W_CERT_INVALID]
+        G = [g1, g2, g3]
+        if self.cleaning is not None:
+            # Same bound as `cleaning.unmet_demand_bound`, on the demand columns of M.
+            columns, dedicated, full = self.cleaning
+            overflow = np.maximum(M[:, columns] - dedicated, 0).sum(axis=1)
+            G.append(np.maximum(overflow - full, 0))
+        G = np.column_stack(G)
+        self.n_evaluated += len(M)
+        self.n_infeasible += int(np.count_nonzero((G > 0).any(axis=1)))
+        F = [f1, f2, f3]
+        if self.robust is not None:
+            F[1], cvar = self.robust.evaluate(x)
+            F.append(cvar)
+        elif self.n_obj > 3:
+            F.append(M[:, W_SHUNTING] + self.shunting_base)
+        out["F"] = np.column_stack(F)
+        out["G"] = G
+
+
+class TrainSchedulingProblemV2(TrainSchedulingProblemV3):
+    """The v2 model: mileage and punctuality only, no branding objective."""
+
+    def __init__(self, df, n_select=N_TO_SELECT, cleaning=None):
+        super().__init__(df, n_select, cleaning=cleaning)
+        self.n_obj = 2
+
+    def _evaluate(self, x, out, *args, **kwargs):
+        super()._evaluate(x, out, *args, **kwargs)
+        out["F"] = out["F"][:, :2]
@@ -0,0 +1,186 @@
+import time
+from dataclasses import dataclass
+
+import numpy as np
+from pymoo.operators.survival.rank_and_crowding.metrics import calc_crowding_distance
+from pymoo.util.nds.non_dominated_sorting import NonDominatedSorting
+
+from .features import add_mileage_scores
+from .operators import top_k_mask
+from .presolve import InfeasibleNightError
+from .problem import (N_TO_SELECT, W_BRANDING, W_CERT_INVALID, W_JOB_CARD_OPEN, W_MILEAGE,
+                      W_PUNCTUALITY, TrainSchedulingProblemV3)
+
+DERIVED_COLUMNS = ("mileage_norm", "punctuality_score")  # follow from `mileage`
+
+
+@dataclass
+class ReplanResult:
+    X: np.ndarray
+    F: np.ndarray
+    n_repaired: int
+    n_evaluated: int
+    elapsed: float
+
+
+def _non_dominated_unique(X, F, max_size):
+    nd = NonDominatedSorting().do(F, only_non_dominated_front=True)
+    X, F = X[nd], F[nd]
+    _, keep = np.unique(X, axis=0, return_index=True)
+    keep = np.sort(keep)
+    X, F = X[keep], F[keep]
+    if len(X) > max_size:
+        # Same truncation NSGA2 applies to its last front: keep the most spread out.
+        keep = np.sort(np.argsort(-calc_crowding_distance(F), kind="stable")[:max_size])
+        X, F = X[keep], F[keep]
+    return X, F
+
+
+class Replanner:
+    """Keeps a solved night in memory and patches it when trainsets change.
+
+    `replan(delta)` takes `{trainsetId: {column: value}}`, e.g.
+    `{"TS004": {"job_card_open": True}}`, writes the new values into the
+    affected feature rows, rebuilds only those rows of the problem's weight
+    matrix (plus, after a mileage change, every row whose punctuality score
+    moved with the fleet's mileage range), repairs every front solution that
+    now uses an ineligible trainset and finishes with a short
+    swap-neighbourhood Pareto local search.
+    """
+
+    def __init__(self, df, X, n_select=N_TO_SELECT):
+        self.df = df.reset_index(drop=True).copy()
+        self.problem = TrainSchedulingProblemV3(self.df, n_select)
+        self.row_of = {tid: i for i, tid in enumerate(self.df["trainsetId"])}
+        self.X = np.atleast_2d(np.asarray(X, dtype=bool))
+        self.F = self.evaluate(self.X)
+
+    @property
+    def n_select(self):
+        return self.problem.n_select
+
+    @property
+    def eligible(self):
+        W = self.problem.W
+        return (W[:, W_JOB_CARD_OPEN] == 0) & (W[:, W_CERT_INVALID] == 0)
+
+    def evaluate(self, X):
+        return self.problem.evaluate(X, return_values_of=["F"])
+
+    def apply(self, delta):
+        """Write `delta` into the feature table; returns the touched rows.
+
+        The derived mileage scores cannot be set directly; they are
+        recomputed fleet-wide whenever a `mileage` value changes.
+        """
+        rows = []
+        mileage_changed = False
+        for tid, changes in delta.items():
+            derived = set(changes) & set(DERIVED_COLUMNS)
+            if derived:
+                raise ValueError(f"{', '.join(sorted(derived))} follow from mileage; update 'mileage' instead.")
+            row = self.row_of[tid]
+            for column, value in changes.items():
+                self.df.at[row, column] = value
+            mileage_changed |= "mileage" in changes
+            rows.append(row)
+        if mileage_changed:
+            # The scores are normalised by the fleet's min and max mileage, so
+            # one change can move every row's punctuality score.
+            before = self.df["punctuality_score"].to_numpy(copy=True)
+            add_mileage_scores(self.df)
+            rows.extend(np.flatnonzero(self.df["punctuality_score"].to_numpy() != before))
+        rows = np.unique(rows)
+        self.problem.update_rows(rows)
+        return rows
+
+    def _substitute_scores(self, F):
+        """(n_solutions, n_trains) desirability of each trainset per solution.
+
+        Each solution scores trainsets with weights that favour the objectives
+        it is already good at, so a repair keeps the solution's place on the
+        front instead of pulling every solution to the same compromise.
+        """
+        W = self.problem.W
+        C = np.column_stack([W[:, W_MILEAGE], -W[:, W_PUNCTUALITY], -W[:, W_BRANDING]])
+        span = np.ptp(C, axis=0)
+        C = (C - C.min(axis=0)) / np.where(span > 0, span, 1.0)
+
+        f_span = np.ptp(F, axis=0)
+        Fn = (F - F.min(axis=0)) / np.where(f_span > 0, f_span, 1.0)
+        weights = 1.0 - Fn + 0.1
+        weights /= weights.sum(axis=1, keepdims=True)
+        return -(weights @ C.T)
+
+    def repair(self, X, F):
+        """Swap ineligible trainsets out for each solution's best eligible substitutes."""
+        eligible = self.eligible
+        if eligible.sum() < self.n_select:
+            excluded = self.df["trainsetId"].to_numpy()[~eligible]
+            raise InfeasibleNightError(int(eligible.sum()), self.n_select, excluded)
+
+        broken = (X & ~eligible).any(axis=1)
+        if broken.any():
+            scores = self._substitute_scores(F)[broken]
+            span = np.ptp(scores, axis=1, keepdims=True)
+            scores = (scores - scores.min(axis=1, keepdims=True)) / np.where(span > 0, span, 1.0)
+            keys = np.where(eligible, X[broken] * 2.0 + 0.999 * scores, -np.inf)
+            X = X.copy()
+            X[broken] = top_k_mask(keys, self.n_select)
+        return X, int(broken.sum())
+
+    def neighbours(self, X, max_neighbours, rng):
+        """Single-swap neighbours (one selected out, one eligible unselected in)."""
+        k = self.n_select
+        candidates = ~X & self.eligible
+        ones = np.argsort(~X, axis=1, kind="stable")[:, :k]
+        n_free = candidates.sum(axis=1)
+        zeros = np.argsort(~candidates, axis=1, kind="stable")[:, :n_free.max()]
+
+        valid = np.arange(zeros.shape[1])[None, None, :] < n_free[:, None, None]
+        s, a, b = np.nonzero(np.broadcast_to(valid, (len(X), k, zeros.shape[1])))
+        if len(s) > max_neighbours:
+            pick = rng.choice(len(s), max_neighbours, replace=False)
+            s, a, b = s[pick], a[pick], b[pick]
+
+        Xn = X[s].copy()
+        r = np.arange(len(s))
+        Xn[r, ones[s, a]] = False
+        Xn[r, zeros[s, b]] = True
+        return Xn
+
+    def replan(self, delta=None, max_rounds=5, max_neighbours=10_000, max_front=200, time_budget=0.5,
+               seed=None):
+        """Apply `delta` and return the repaired, locally improved front.
+
+        Raises InfeasibleNightError if the change leaves too few eligible
+        trainsets. At most `max_front` solutions are kept, and the local
+        search stops after `max_rounds` rounds or `time_budget` seconds.
+        """
+        start = time.perf_counter()
+        rng = np.random.default_rng(seed)
+        if delta:
+            self.apply(delta)
+
+        X, n_repaired = self.repair(self.X, self.F)
+        F = self.evaluate(X)
+        X, F = _non_dominated_unique(X, F, max_front)
+        n_evaluated = len(X)
+
+        # Pareto local search: expand the current front by single swaps and keep
+        # the non-dominated union until it stops changing or time runs out.
+        for _ in range(max_rounds):
+            if time.perf_counter() - start > time_budget:
+                break
+            Xn = self.neighbours(X, max_neighbours, rng)
+            if len(Xn) == 0:
+                break
+            Fn = self.evaluate(Xn)
+            n_evaluated += len(Xn)
+            X_new, F_new = _non_dominated_unique(np.vstack([X, Xn]), np.vstack([F, Fn]), max_front)
+            if len(X_new) == len(X) and np.array_equal(np.sort(F_new, axis=0), np.sort(F, axis=0)):
+                break
+            X, F = X_new, F_new
+
+        self.X, self.F = X, F
+        return ReplanResult(X, F, n_repaired, n_evaluated, time.perf_counter() - start)
@@ -0,0 +1,54 @@
+import math
+
+import numpy as np
+
+# Robust objectives under random trainset failures. Each trainset fails
+# overnight with a probability that grows with its mileage and its job-card
+# history. One (n_scenarios, n_trainsets) availability tensor is drawn per run
+# from a fixed seed (common random numbers), so every candidate is scored on
+# the same scenarios; a population's available trainsets per scenario are
+# then one (pop, n) @ (n, n_scenarios) product.
+
+N_SCENARIOS = 256
+CVAR_ALPHA = 0.9          # CVaR averages the worst (1 - alpha) share of scenarios
+BASE_FAILURE = 0.01       # failure probability of the lowest-mileage trainset
+MILEAGE_FAILURE = 0.04    # added across the fleet's mileage range
+JOB_CARD_FAILURE = 0.01   # added per recorded job card
+MAX_FAILURE = 0.5
+ROBUST_OBJECTIVE_NAMES = ("mileage", "expected_shortfall", "branding", "cvar_shortfall")
+
+
+def failure_probability(df):
+    """Overnight failure probability per trainset of `df` (the features table)."""
+    n_cards = df["n_job_cards"].to_numpy(dtype=np.float64)
+    mileage = df["mileage"].to_numpy(dtype=np.float64)
+    span = mileage.max() - mileage.min()
+    relative = (mileage - mileage.min()) / span if span > 0 else np.zeros_like(mileage)
+    return np.clip(BASE_FAILURE + MILEAGE_FAILURE * relative + JOB_CARD_FAILURE * n_cards, 0.0, MAX_FAILURE)
+
+
+class RobustShortfall:
+    """Expected and CVaR shortfall of available trainsets against `target`."""
+
+    def __init__(self, p_fail, target, n_scenarios=N_SCENARIOS, alpha=CVAR_ALPHA, seed=1):
+        self.p_fail = np.asarray(p_fail, dtype=np.float64)
+        self.target = target
+        self.alpha = alpha
+        # Common random numbers: drawn once, shared by every evaluation.
+        draws = np.random.default_rng(seed).random((n_scenarios, len(self.p_fail)))
+        self.available = np.ascontiguousarray((draws >= self.p_fail).T, dtype=np.float64)
+        self.n_tail = max(math.ceil((1 - alpha) * n_scenarios), 1)
+
+    @property
+    def n_scenarios(self):
+        return self.available.shape[1]
+
+    def shortfall(self, X):
+        """(pop, n_scenarios) trainsets missing from `target` in each scenario."""
+        return np.maximum(self.target - np.asarray(X, dtype=np.float64) @ self.available, 0.0)
+
+    def evaluate(self, X):
+        """(expected, CVaR) shortfall for every row of X."""
+        S = self.shortfall(X)
+        tail = np.partition(S, S.shape[1] - self.n_tail, axis=1)[:, S.shape[1] - self.n_tail:]
+        return S.mean(axis=1), tail.mean(axis=1)
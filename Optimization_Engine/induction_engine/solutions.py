@@ -0,0 +1,145 @@
+import json
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
+# Whole-front extraction: one pass over the (n_solutions, n_trains) mask matrix
+# gives every solution's selected trainsets as a packed bitset and as CSR index
+# arrays, next to its objectives in report units. No per-solution DataFrame
+# filtering; the table writes straight to JSON or Parquet.
+
+OBJECTIVE_NAMES = ("mileage", "punctuality", "branding", "standby_depth")
+# Objectives minimised as negatives, reported as positive scores.
+MAXIMISED = ("branding", "standby_depth")
+
+
+def report_objectives(F, names=OBJECTIVE_NAMES):
+    """Objectives in report units: punctuality in %, maximised objectives as
+    positive scores."""
+    F = np.array(F, dtype=np.float64, ndmin=2)
+    for j, name in enumerate(names[:F.shape[1]]):
+        if name == "punctuality":
+            F[:, j] = 100 - F[:, j]
+        elif name in MAXIMISED:
+            F[:, j] = -F[:, j]
+    return F
+
+
+@dataclass
+class SolutionTable:
+    """A Pareto front as compact columns.
+
+    Solution `i` selects `trainset_ids[indices[indptr[i]:indptr[i + 1]]]`;
+    `bitset[i]` is the same selection packed 8 trainsets per byte (MSB first).
+    For the assignment model, `labels[i]` holds every trainset's class code.
+    """
+
+    trainset_ids: np.ndarray
+    bitset: np.ndarray
+    indptr: np.ndarray
+    indices: np.ndarray
+    objectives: np.ndarray
+    objective_names: tuple
+    labels: np.ndarray = None
+
+    @classmethod
+    def from_front(cls, X, F, trainset_ids, labels=None, objective_names=OBJECTIVE_NAMES):
+        X = np.atleast_2d(np.asarray(X, dtype=bool))
+        F = report_objectives(F, objective_names)
+        _, indices = np.nonzero(X)
+        indptr = np.zeros(len(X) + 1, dtype=np.int64)
+        np.cumsum(X.sum(axis=1), out=indptr[1:])
+        return cls(np.asarray(trainset_ids).astype(str), np.packbits(X, axis=1), indptr,
+                   indices.astype(np.int32), F, tuple(objective_names[:F.shape[1]]),
+                   None if labels is None else np.asarray(labels, dtype=np.int8))
+
+    def __len__(self):
+        return len(self.objectives)
+
+    @property
+    def solution_id(self):
+        return np.arange(1, len(self) + 1)
+
+    @property
+    def n_selected(self):
+        return np.diff(self.indptr)
+
+    @property
+    def masks(self):
+        return np.unpackbits(self.bitset, axis=1, count=len(self.trainset_ids)).astype(bool)
+
+    def selected(self, i):
+        """Trainset ids of solution `i` (0-based)."""
+        return self.trainset_ids[self.indices[self.indptr[i]:self.indptr[i + 1]]]
+
+    def bitset_hex(self):
+        width = 2 * self.bitset.shape[1]
+        text = np.ascontiguousarray(self.bitset).tobytes().hex()
+        return [text[i:i + width] for i in range(0, len(text), width)]
+
+    def columns(self):
+        """Column name -> plain Python list, for JSON or a DataFrame."""
+        columns = {
+            "solution_id": self.solution_id.tolist(),
+            "n_selected": self.n_selected.tolist(),
+            "bitset": self.bitset_hex(),
+            "selected": [a.tolist() for a in np.split(self.indices, self.indptr[1:-1])],
+        }
+        if self.labels is not None:
+            columns["labels"] = self.labels.tolist()
+        for j, name in enumerate(self.objective_names):
+            columns[name] = self.objectives[:, j].tolist()
+        return columns
+
+    def to_frame(self):
+        import pandas as pd
+
+        frame = pd.DataFrame(self.columns())
+        frame["selected"] = np.split(self.trainset_ids[self.indices], self.indptr[1:-1])
+        return frame
+
+    def to_json(self, path):
+        """Columnar JSON; `selected` holds indices into `trainset_ids`."""
+        payload = {"trainset_ids": self.trainset_ids.tolist(),
+                   "objectives": list(self.objective_names),
+                   "solutions": self.columns()}
+        _atomic_write(path, lambda tmp: _write_text(tmp, json.dumps(payload)))
+
+    def to_parquet(self, path):
+        """One row per solution; `selected` is a list<string> of trainset ids."""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet export needs pyarrow; install the engine with the `parquet` extra.") from e
+
+        arrays = {
+            "solution_id": pa.array(self.solution_id, pa.int32()),
+            "n_selected": pa.array(self.n_selected, pa.int32()),
+            "bitset": pa.FixedSizeBinaryArray.from_buffers(
+                pa.binary(self.bitset.shape[1]), len(self),
+                [None, pa.py_buffer(np.ascontiguousarray(self.bitset).tobytes())]),
+            "selected": pa.ListArray.from_arrays(pa.array(self.indptr, pa.int32()),
+                                                 pa.array(self.trainset_ids[self.indices])),
+        }
+        if self.labels is not None:
+            n = self.labels.shape[1]
+            arrays["labels"] = pa.FixedSizeListArray.from_arrays(pa.array(self.labels.ravel(), pa.int8()), n)
+        for j, name in enumerate(self.objective_names):
+            arrays[name] = pa.array(self.objectives[:, j])
+        table = pa.table(arrays).replace_schema_metadata(
+            {"trainset_ids": json.dumps(self.trainset_ids.tolist())})
+        _atomic_write(path, lambda tmp: pq.write_table(table, tmp))
+
+
+def _write_text(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def _atomic_write(path, write):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
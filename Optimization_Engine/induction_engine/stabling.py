@@ -0,0 +1,138 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import linear_sum_assignment
+
+from .assignment import IBL, N_CLASSES, REVENUE, STANDBY
+from .features import DATA_DIR, source_path
+
+# Stabling stage: put every trainset of a plan into a depot bay so the morning
+# departures need as few shunting moves as possible.
+#
+# stabling_bays.csv has no geometry, so the depot is modelled as dead-end
+# stabling lines of `bays_per_line` bays in bayId order, reached over a common
+# ladder track; slot 0 of a line is at the exit end. A train in slot s is
+# blocked by the s trains in front of it. Bay-to-bay and bay-to-exit costs are
+# precomputed once, so a train's cost for any bay is an array lookup.
+
+BAY_CLASSES = {"Revenue": REVENUE, "Standby": STANDBY, "IBL": IBL}
+BAYS_PER_LINE = 2
+LADDER_COST = 0.01     # per line crossed on the ladder; a tie-breaker, not a move
+MISMATCH_COST = 100.0  # a train stabled in a bay of another type
+# How much each class's exit depth matters: revenue trains all leave in the
+# morning, standby trains may be called out, IBL trains stay put.
+DEPARTURE_WEIGHT = np.array([1.0, 0.25, 0.0])
+
+
+@dataclass
+class Depot:
+    bay_ids: np.ndarray
+    bay_class: np.ndarray
+    slot: np.ndarray
+    exit_cost: np.ndarray
+    distance: np.ndarray
+    home_bay: dict
+    bays_per_line: int
+
+    @property
+    def n_bays(self):
+        return len(self.bay_ids)
+
+
+def depot_layout(n_bays, bays_per_line=BAYS_PER_LINE):
+    """(slot, exit_cost, distance) for `n_bays` bays in lines of `bays_per_line`.
+
+    Moving a train from bay a to bay b takes one move plus one for every train
+    in front of it at a and in front of its place at b.
+    """
+    index = np.arange(n_bays)
+    line, slot = np.divmod(index, bays_per_line)
+    exit_cost = slot + LADDER_COST * line
+    distance = 1.0 + slot[:, None] + slot[None, :] + LADDER_COST * np.abs(line[:, None] - line[None, :])
+    np.fill_diagonal(distance, 0.0)
+    return slot, exit_cost, distance
+
+
+def load_depot(data_dir=DATA_DIR, bays_per_line=BAYS_PER_LINE):
+    bays = pd.read_csv(source_path(data_dir, "stabling_bays.csv")).sort_values("bayId", kind="stable")
+    slot, exit_cost, distance = depot_layout(len(bays), bays_per_line)
+    home_bay = {tid: i for i, tid in enumerate(bays["trainsetId"]) if isinstance(tid, str)}
+    return Depot(bays["bayId"].to_numpy(dtype=str), bays["bayType"].map(BAY_CLASSES).to_numpy(dtype=np.int64),
+                 slot, exit_cost, distance, home_bay, bays_per_line)
+
+
+def placement_cost(depot, trainset_ids, classes):
+    """(n_trains, n_bays) cost of stabling each train, in its class, in each bay.
+
+    The cost is the moves from the train's current bay (trains without one
+    come in from the exit), plus its class-weighted exit depth and a penalty
+    for a bay of the wrong type.
+    """
+    home = np.array([depot.home_bay.get(tid, -1) for tid in trainset_ids])
+    classes = np.asarray(classes)
+    move = np.where(home[:, None] >= 0, depot.distance[home], depot.exit_cost[None, :])
+    return (move + DEPARTURE_WEIGHT[classes][:, None] * depot.exit_cost[None, :]
+            + MISMATCH_COST * (depot.bay_class[None, :] != classes[:, None]))
+
+
+def class_costs(depot, trainset_ids):
+    """(n_trains, 3) cheapest bay cost of each train in each class.
+
+    Bays are not shared in this bound, so it is what an optimizer objective
+    can afford per candidate; `assign_bays` resolves the conflicts.
+    """
+    return np.column_stack([
+        placement_cost(depot, trainset_ids, np.full(len(trainset_ids), c)).min(axis=1)
+        for c in range(N_CLASSES)
+    ])
+
+
+@dataclass
+class StablingPlan:
+    """Bay per trainset for each plan of a front; -1 for trainsets left unplaced."""
+
+    bay_ids: np.ndarray
+    bay_of: np.ndarray
+    cost: np.ndarray
+    n_moves: np.ndarray
+    n_mismatched: np.ndarray
+
+
+def shunting_moves(depot, bay_of, classes, trainset_ids):
+    """Moves needed tonight and tomorrow morning for one bay assignment.
+
+    One move per train not already in its bay, plus one per non-revenue train
+    standing in front of a revenue train in the same line.
+    """
+    home = np.array([depot.home_bay.get(tid, -1) for tid in trainset_ids])
+    placed = bay_of >= 0
+    relocations = int(np.count_nonzero(placed & (bay_of != home)))
+
+    n_lines = -(-depot.n_bays // depot.bays_per_line)
+    occupant = np.full(n_lines * depot.bays_per_line, -1)
+    occupant[bay_of[placed]] = np.asarray(classes)[placed]
+    occupant = occupant.reshape(n_lines, depot.bays_per_line)
+    blocker = (occupant != REVENUE) & (occupant >= 0)
+    in_front = np.cumsum(blocker, axis=1) - blocker
+    return relocations + int(in_front[occupant == REVENUE].sum())
+
+
+def assign_bays(depot, trainset_ids, classes):
+    """Optimal one-train-per-bay assignment (Hungarian) for every plan.
+
+    `classes` is (n_plans, n_trains) of class codes. Returns a StablingPlan.
+    """
+    classes = np.atleast_2d(classes)
+    bay_of = np.full(classes.shape, -1, dtype=np.int64)
+    cost = np.zeros(len(classes))
+    n_moves = np.zeros(len(classes), dtype=np.int64)
+    n_mismatched = np.zeros(len(classes), dtype=np.int64)
+    for i, plan_classes in enumerate(classes):
+        C = placement_cost(depot, trainset_ids, plan_classes)
+        rows, cols = linear_sum_assignment(C)
+        bay_of[i, rows] = cols
+        cost[i] = C[rows, cols].sum()
+        n_moves[i] = shunting_moves(depot, bay_of[i], plan_classes, trainset_ids)
+        n_mismatched[i] = np.count_nonzero(depot.bay_class[cols] != plan_classes[rows])
+    return StablingPlan(depot.bay_ids, bay_of, cost, n_moves, n_mismatched)
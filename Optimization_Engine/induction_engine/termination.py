@@ -0,0 +1,108 @@
+import time
+from collections import deque
+
+import numpy as np
+from pymoo.core.termination import Termination
+from pymoo.indicators.hv import HV
+
+
+def _normalize(F, ideal, nadir):
+    span = np.where(nadir - ideal > 0, nadir - ideal, 1.0)
+    return (F - ideal) / span
+
+
+class HypervolumeTermination(Termination):
+    """Stop once the feasible front stops improving.
+
+    Every generation the feasible non-dominated set (`algorithm.opt`) is kept
+    in a sliding window of `window` generations. Both ends of the window are
+    normalised with the ideal/nadir of the whole window, and the run stops
+    when the relative hypervolume gain and the movement of the ideal and
+    nadir points over the window are all below `tol`. `n_max_gen` and
+    `max_time` (seconds) are hard caps in case the front keeps moving.
+    Runs that are not one pymoo algorithm (the island model) feed their
+    fronts through `observe` instead.
+    """
+
+    def __init__(self, window=20, tol=1e-4, n_max_gen=400, max_time=None):
+        super().__init__()
+        self.window = window
+        self.tol = tol
+        self.n_max_gen = n_max_gen
+        self.max_time = max_time
+        self.fronts = deque(maxlen=window + 1)
+        self.start = None
+        self.n_gen = 0
+        self.reason = None
+        self.hv_gain = np.inf
+        self.movement = np.inf
+
+    @property
+    def elapsed(self):
+        return 0.0 if self.start is None else time.perf_counter() - self.start
+
+    def _update(self, algorithm):
+        opt = algorithm.opt
+        F = opt.get("F")[opt.get("CV")[:, 0] <= 0] if opt is not None else np.empty((0, 0))
+        return self.observe(algorithm.n_gen, F)
+
+    def observe(self, n_gen, F):
+        """Record the feasible front F reached at generation `n_gen`; returns
+        the progress, 1.0 once the run should stop."""
+        if self.start is None:
+            self.start = time.perf_counter()
+        self.n_gen = n_gen
+
+        if self.n_gen >= self.n_max_gen:
+            self.reason = "n_max_gen"
+            return 1.0
+        if self.max_time is not None and self.elapsed >= self.max_time:
+            self.reason = "max_time"
+            return 1.0
+
+        if len(F) == 0:
+            # Nothing feasible yet, so there is no front to converge.
+            self.fronts.clear()
+            return self._progress()
+
+        self.fronts.append(np.array(F, dtype=np.float64))
+        if len(self.fronts) <= self.window:
+            return self._progress()
+
+        first, last = self.fronts[0], self.fronts[-1]
+        union = np.vstack(self.fronts)
+        ideal, nadir = union.min(axis=0), union.max(axis=0)
+        hv = HV(ref_point=np.full(union.shape[1], 1.1))
+        hv_first = hv(_normalize(first, ideal, nadir))
+        hv_last = hv(_normalize(last, ideal, nadir))
+        self.hv_gain = (hv_last - hv_first) / max(hv_last, 1e-12)
+
+        span = np.where(nadir - ideal > 0, nadir - ideal, 1.0)
+        self.movement = max(
+            np.max(np.abs(first.min(axis=0) - last.min(axis=0)) / span),
+            np.max(np.abs(first.max(axis=0) - last.max(axis=0)) / span),
+        )
+
+        if self.hv_gain < self.tol and self.movement < self.tol:
+            self.reason = "converged"
+            return 1.0
+        return self._progress()
+
+    def _progress(self):
+        progress = self.n_gen / self.n_max_gen
+        if self.max_time is not None:
+            progress = max(progress, self.elapsed / self.max_time)
+        return min(progress, 0.99)
+
+    def time_saved(self):
+        """Estimated seconds saved against running all `n_max_gen` generations."""
+        if self.n_gen == 0:
+            return 0.0
+        return (self.n_max_gen - self.n_gen) * self.elapsed / self.n_gen
+
+    def summary(self):
+        if self.reason == "converged":
+            return (f"Converged after {self.n_gen}/{self.n_max_gen} generations in {self.elapsed:.2f}s "
+                    f"(hypervolume gain {self.hv_gain:.1e} over the last {self.window}); "
+                    f"saved {self.n_max_gen - self.n_gen} generations, ~{self.time_saved():.2f}s.")
+        return f"Stopped on {self.reason} after {self.n_gen} generations in {self.elapsed:.2f}s."
@@ -0,0 +1,79 @@
+import hashlib
+import os
+
+import numpy as np
+
+from .operators import random_k_hot, repair_to_k, swap_mutation
+
+# Persist each night's final front and seed the next run with it. One night's
+# fleet differs from the next by a handful of status changes, so the stored
+# masks, repaired against the new constraints, start NSGA2 close to the answer.
+
+FINGERPRINT_COLUMNS = ["trainsetId", "mileage", "punctuality_score", "branding_priority_score",
+                       "job_card_open", "fitness_certificate_valid"]
+
+
+def fingerprint(df, columns=FINGERPRINT_COLUMNS):
+    """Content hash of the feature columns the optimizer reads."""
+    h = hashlib.sha256()
+    for column in columns:
+        h.update(column.encode())
+        h.update(np.asarray(df[column].to_numpy()).astype(str).tobytes())
+    return h.hexdigest()
+
+
+def save_front(path, X, F, trainset_ids, input_fingerprint, n_gen, cold_n_gen=None):
+    """Store a front as full-fleet masks keyed by trainset id.
+
+    `cold_n_gen` is the generation count of the last cold start, carried from
+    run to run so warm runs can report the generations they saved.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    np.savez(path, X=np.asarray(X, dtype=bool), F=np.asarray(F, dtype=np.float64),
+             trainset_ids=np.asarray(trainset_ids, dtype=str), fingerprint=input_fingerprint,
+             n_gen=n_gen, cold_n_gen=n_gen if cold_n_gen is None else cold_n_gen)
+
+
+def load_front(path):
+    """The stored front as a dict, or None when there is nothing to warm-start from."""
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        return {
+            "X": data["X"],
+            "F": data["F"],
+            "trainset_ids": data["trainset_ids"],
+            "fingerprint": str(data["fingerprint"]),
+            "n_gen": int(data["n_gen"]),
+            "cold_n_gen": int(data["cold_n_gen"]),
+        }
+
+
+def align_masks(stored, trainset_ids):
+    """Re-key stored masks onto `trainset_ids`; unknown trainsets start at 0."""
+    position = {tid: i for i, tid in enumerate(stored["trainset_ids"])}
+    src = np.array([position.get(tid, -1) for tid in trainset_ids])
+    X = np.zeros((len(stored["X"]), len(trainset_ids)), dtype=bool)
+    known = src >= 0
+    X[:, known] = stored["X"][:, src[known]]
+    return X
+
+
+def warm_start_population(stored, df, k, pop_size, seed=None, priority=None):
+    """Initial population seeded from a stored front.
+
+    Stored masks are aligned to `df` (typically the pre-solved, eligible
+    trainsets only, so newly ineligible ones drop out) and repaired to exactly
+    k ones. Up to half the population is filled with the repaired seeds and
+    swap-mutated copies of them; the rest is random to keep diversity.
+    """
+    rng = np.random.default_rng(seed)
+    n_var = len(df)
+    seeds = repair_to_k(align_masks(stored, df["trainsetId"].to_numpy()), k, rng, priority)
+    seeds = np.unique(seeds, axis=0)[:pop_size // 2]
+
+    n_mutants = max(pop_size // 2 - len(seeds), 0)
+    if len(seeds) and n_mutants:
+        mutants = swap_mutation(seeds[rng.integers(len(seeds), size=n_mutants)], 1, rng)
+        seeds = np.unique(np.vstack([seeds, mutants]), axis=0)
+    return np.vstack([seeds, random_k_hot(pop_size - len(seeds), n_var, k, rng)])